@@ -42,14 +42,29 @@ class UserAdmin(BaseUserAdmin):
     )
     
     readonly_fields = ['created_at', 'updated_at', 'last_login_at', 'email_verified_at']
+    
+    # Token and OTP columns are never rendered by the changelist or the forms
+    deferred_fields = [
+        'verification_token', 'two_factor_secret',
+        'password_reset_token', 'password_reset_expires',
+        'otp_code', 'otp_expires', 'otp_purpose',
+    ]
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer(*self.deferred_fields)
 
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'hire_date', 'timezone', 'language', 'created_at']
+    list_display = ['user', 'manager', 'hire_date', 'timezone', 'language', 'created_at']
     list_filter = ['timezone', 'language', 'email_notifications']
     search_fields = ['user__email', 'user__first_name', 'user__last_name']
     readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['user', 'manager']
+    list_select_related = ['user', 'manager']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'manager')
 
 
 @admin.register(LoginAttempt)
@@ -4,8 +4,93 @@ Custom JWT Authentication for Multi-Tenant Setup
 Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
+import hashlib
+import threading
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from django_tenants.utils import schema_context
+from .cache import TokenDenylist, UserCache
+
+
+class ValidatedTokenCache:
+    """
+    Process-local TTL cache of successfully validated access tokens.
+    
+    Entries are keyed by a BLAKE2b digest of the raw token (the token itself
+    is never stored) and expire at the token's own `exp` claim, clamped to
+    MAX_TTL seconds. A hit only skips signature verification: the caller
+    still checks TokenDenylist and loads the user on every request.
+    Failed validations are never cached.
+    """
+    
+    MAX_TTL = 300  # 5 minutes
+    MAX_ENTRIES = 10000
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def make_key(raw_token):
+        """Return the cache key for a raw token."""
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.blake2b(raw_token, digest_size=16).digest()
+    
+    def get(self, key):
+        """Return the cached validated token or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.time():
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key, value, exp=None):
+        """Cache a value until the token's `exp` (clamped to MAX_TTL)."""
+        now = time.time()
+        expires_at = now + self.MAX_TTL
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                self._purge(now)
+            self._entries[key] = (expires_at, value)
+    
+    def delete(self, key):
+        """Drop a cached entry (e.g. on logout)."""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+    
+    def _purge(self, now):
+        """Remove expired entries, or everything if the cache is still full."""
+        expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+        for k in expired:
+            del self._entries[k]
+        if len(self._entries) >= self.MAX_ENTRIES:
+            self._entries.clear()
+
+
+validated_token_cache = ValidatedTokenCache()
 
 
 class TenantJWTAuthentication(JWTAuthentication):
@@ -15,8 +100,56 @@ class TenantJWTAuthentication(JWTAuthentication):
     In a multi-tenant setup with schema-per-tenant, users are stored in the
     public schema (shared), but JWT authentication runs in the tenant schema context.
     This class ensures user lookup happens in the public schema.
+    
+    Validated tokens are cached per process (see ValidatedTokenCache) so
+    that a reused bearer token skips signature verification. Every request,
+    cached or not, is still checked against the shared TokenDenylist, and
+    its user is loaded through the shared UserCache (keyed by id, and
+    invalidated on save) before falling back to the database, so logout,
+    revocation and deactivation apply on all workers at once. Set
+    CACHE_VALIDATED_JWT to False to disable the token cache.
     """
     
+    # Credentials are never needed to authenticate a request, and the user
+    # is stored in the shared cache, so leave them out
+    DEFERRED_USER_FIELDS = UserCache.SECRET_USER_FIELDS
+    
+    def authenticate(self, request):
+        """
+        Authenticate the request, serving repeated tokens from the cache.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        
+        if not getattr(settings, 'CACHE_VALIDATED_JWT', True):
+            validated_token = self.get_validated_token(raw_token)
+            return self.get_user(validated_token), validated_token
+        
+        cache_key = validated_token_cache.make_key(raw_token)
+        validated_token = validated_token_cache.get(cache_key)
+        if validated_token is None:
+            validated_token = self.get_validated_token(raw_token)
+            validated_token_cache.set(cache_key, validated_token, exp=validated_token.get('exp'))
+        elif TokenDenylist.contains(validated_token):
+            # Revoked since it was cached, possibly by another worker
+            raise InvalidToken("Token has been revoked")
+        
+        return self.get_user(validated_token), validated_token
+    
+    def get_validated_token(self, raw_token):
+        """
+        Validate the token and reject it if it was revoked (e.g. on logout).
+        """
+        validated_token = super().get_validated_token(raw_token)
+        if TokenDenylist.contains(validated_token):
+            raise InvalidToken("Token has been revoked")
+        return validated_token
+    
     def get_user(self, validated_token):
         """
         Override to look up user in public schema.
@@ -24,20 +157,29 @@ class TenantJWTAuthentication(JWTAuthentication):
         try:
             user_id = validated_token[self.get_jwt_value(validated_token)]
         except KeyError:
-            from rest_framework_simplejwt.exceptions import InvalidToken
             raise InvalidToken("Token contained no recognizable user identification")
         
-        # Look up user in public schema
-        with schema_context('public'):
-            try:
-                from .models import User
-                user = User.objects.get(**{self.user_model.USERNAME_FIELD: user_id})
-            except User.DoesNotExist:
-                from rest_framework_simplejwt.exceptions import AuthenticationFailed
-                raise AuthenticationFailed("User not found", code="user_not_found")
+        # Shared cache first, so other workers' lookups are reused
+        user = UserCache.get_cached_user_by_id(user_id)
+        if user is None:
+            # Look up user in public schema, skipping the search_path switch
+            # (and the switch back) when the request is already on it
+            if connection.schema_name == 'public':
+                public_schema = nullcontext()
+            else:
+                public_schema = schema_context('public')
+            
+            with public_schema:
+                try:
+                    user = self.user_model.objects.defer(*self.DEFERRED_USER_FIELDS).get(
+                        **{api_settings.USER_ID_FIELD: user_id}
+                    )
+                except (self.user_model.DoesNotExist, ValueError, ValidationError):
+                    raise AuthenticationFailed("User not found", code="user_not_found")
+            
+            UserCache.cache_user_by_id(user)
         
         if not user.is_active:
-            from rest_framework_simplejwt.exceptions import AuthenticationFailed
             raise AuthenticationFailed("User is inactive", code="user_inactive")
         
         return user
@@ -0,0 +1,190 @@
+"""
+Authentication Caching Utilities
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Short-lived caches of users: by email for the OTP and password-reset
+    endpoints, and by id for JWT authentication.
+    
+    Cached instances never carry credentials: the password hash and the
+    OTP, reset and 2FA columns are deferred, so code that needs them (OTP
+    and reset-token checks, check_password) reads them from the database.
+    
+    Entries are invalidated from the User post_save/post_delete signals and
+    from User.set_otp (which writes with a queryset update), so the TTL only
+    bounds how long an entry can outlive a change made outside the ORM.
+    """
+    
+    # Cache timeouts (in seconds)
+    USER_BY_EMAIL_CACHE_TIMEOUT = 60  # 1 minute
+    USER_BY_ID_CACHE_TIMEOUT = 5 * 60  # 5 minutes
+    USER_DATA_CACHE_TIMEOUT = 5 * 60  # 5 minutes
+    
+    # Kept out of the shared cache; loaded from the database when needed
+    SECRET_USER_FIELDS = (
+        'password', 'verification_token', 'two_factor_secret',
+        'password_reset_token', 'password_reset_expires',
+        'otp_code', 'otp_expires', 'otp_purpose',
+    )
+    
+    @staticmethod
+    def get_user_by_email_cache_key(email):
+        """Get cache key for a user looked up by (lowercased) email."""
+        return f"user:email:{email}"
+    
+    @staticmethod
+    def get_user_by_email(email):
+        """
+        Return the user with this email, or None.
+        
+        Misses are cached too, so repeated requests for unknown addresses
+        do not reach the database either.
+        """
+        from .models import User
+        
+        email = User.objects.normalize_email(email)
+        cache_key = UserCache.get_user_by_email_cache_key(email)
+        return cache.get_or_set(
+            cache_key,
+            lambda: User.objects.defer(*UserCache.SECRET_USER_FIELDS).filter(email=email).first(),
+            UserCache.USER_BY_EMAIL_CACHE_TIMEOUT
+        )
+    
+    @staticmethod
+    def get_user_by_id_cache_key(user_id):
+        """Get cache key for an authenticated user looked up by id."""
+        return f"user:pk:{user_id}"
+    
+    @staticmethod
+    def cache_user_by_id(user):
+        """
+        Cache an authenticated user under its id.
+        """
+        cache_key = UserCache.get_user_by_id_cache_key(user.pk)
+        cache.set(cache_key, user, UserCache.USER_BY_ID_CACHE_TIMEOUT)
+    
+    @staticmethod
+    def get_cached_user_by_id(user_id):
+        """
+        Get a cached authenticated user, or None.
+        """
+        cache_key = UserCache.get_user_by_id_cache_key(user_id)
+        return cache.get(cache_key)
+    
+    @staticmethod
+    def get_user_data_cache_key(user_id):
+        """Get cache key for a user's serialized /me/ payload."""
+        return f"user:serialized:{user_id}"
+    
+    @staticmethod
+    def cache_user_data(user_id, data):
+        """
+        Cache a user's serialized payload (including tenant role fields).
+        """
+        cache_key = UserCache.get_user_data_cache_key(user_id)
+        cache.set(cache_key, data, UserCache.USER_DATA_CACHE_TIMEOUT)
+    
+    @staticmethod
+    def get_cached_user_data(user_id):
+        """
+        Get a user's cached serialized payload, or None.
+        """
+        cache_key = UserCache.get_user_data_cache_key(user_id)
+        return cache.get(cache_key)
+    
+    @staticmethod
+    def invalidate_user_data(user_id):
+        """
+        Invalidate a user's serialized payload (e.g. after a membership change).
+        """
+        cache.delete(UserCache.get_user_data_cache_key(user_id))
+    
+    @staticmethod
+    def invalidate_user(email, user_id=None):
+        """
+        Invalidate the cached lookups for this email (and id, if known).
+        """
+        cache_keys = [UserCache.get_user_by_email_cache_key(email)]
+        if user_id is not None:
+            cache_keys.append(UserCache.get_user_by_id_cache_key(user_id))
+            cache_keys.append(UserCache.get_user_data_cache_key(user_id))
+        cache.delete_many(cache_keys)
+        logger.debug("Invalidated user cache for %s", email)
+
+
+class TokenDenylist:
+    """
+    Revoked JWTs, keyed by their jti claim.
+    
+    Each entry lives only until the token would have expired anyway, so
+    the denylist never outgrows the set of still-valid tokens. A user's
+    tokens can also be revoked wholesale by their issue time.
+    """
+    
+    @staticmethod
+    def get_cache_key(jti):
+        """Get cache key for a revoked token id."""
+        return f"jwt:denylist:{jti}"
+    
+    @staticmethod
+    def add(token):
+        """
+        Revoke a validated token (access or refresh) until its expiry.
+        """
+        jti = token.get(api_settings.JTI_CLAIM)
+        ttl = int(token.get('exp', 0) - time.time())
+        if jti and ttl > 0:
+            cache.set(TokenDenylist.get_cache_key(jti), 1, ttl)
+            logger.debug("Denylisted token %s", jti)
+    
+    @staticmethod
+    def get_user_cache_key(user_id):
+        """Get cache key for the time before which a user's tokens are revoked."""
+        return f"jwt:revoked_before:{user_id}"
+    
+    @staticmethod
+    def revoke_user_tokens(user_id, when):
+        """
+        Revoke every token issued to a user before `when` (e.g. on a
+        password change), for as long as a refresh token issued then
+        could still be used.
+        """
+        ttl = int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+        cache.set(TokenDenylist.get_user_cache_key(user_id), int(when.timestamp()), ttl)
+        logger.debug("Revoked tokens issued before %s for user %s", when, user_id)
+    
+    @staticmethod
+    def contains(token):
+        """
+        Check whether a validated token has been revoked, either by its own
+        jti or by a revocation of all of its user's older tokens.
+        """
+        cache_keys = []
+        jti = token.get(api_settings.JTI_CLAIM)
+        if jti:
+            cache_keys.append(TokenDenylist.get_cache_key(jti))
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            user_key = TokenDenylist.get_user_cache_key(user_id)
+            cache_keys.append(user_key)
+        if not cache_keys:
+            return False
+        
+        # One round trip for both checks
+        revoked = cache.get_many(cache_keys)
+        if jti and TokenDenylist.get_cache_key(jti) in revoked:
+            return True
+        # Access tokens inherit iat from the refresh token they came from
+        revoked_before = revoked.get(user_key) if user_id else None
+        return revoked_before is not None and token.get('iat', 0) < revoked_before
@@ -0,0 +1,22 @@
+"""
+Password Hashers
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with 64 MiB of memory and a single lane.
+    
+    Django's defaults (100 MiB, 8 lanes) make every login hash spread across
+    8 threads; one lane keeps a verify on a single core per request while the
+    memory cost still makes offline guessing expensive. The algorithm name
+    is unchanged, so hashes made with other parameters still verify and are
+    re-hashed with these on the next successful login.
+    """
+    time_cost = 2
+    memory_cost = 65536  # KiB
+    parallelism = 1
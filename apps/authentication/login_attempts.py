@@ -0,0 +1,95 @@
+"""
+Buffered Login Attempt Logging
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class LoginAttemptBuffer:
+    """
+    Per-process buffer that batches LoginAttempt rows off the request path.
+    
+    Requests only append an unsaved LoginAttempt to an in-memory deque. A
+    daemon thread flushes the buffer with bulk_create every FLUSH_INTERVAL
+    seconds, or sooner once MAX_BATCH rows are waiting. Remaining rows are
+    flushed at interpreter exit.
+    """
+    
+    FLUSH_INTERVAL = 0.5  # seconds
+    MAX_BATCH = 100
+    
+    def __init__(self):
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+    
+    def add(self, attempt):
+        """Queue an unsaved LoginAttempt for the next flush."""
+        self._queue.append(attempt)
+        self._ensure_worker()
+        if len(self._queue) >= self.MAX_BATCH:
+            self._wakeup.set()
+    
+    def flush(self):
+        """Write all queued attempts in bulk. Returns the number written."""
+        from .models import LoginAttempt
+        
+        with self._lock:
+            batch = []
+            while self._queue:
+                batch.append(self._queue.popleft())
+            
+            if not batch:
+                return 0
+            
+            try:
+                LoginAttempt.objects.bulk_create(batch, batch_size=self.MAX_BATCH)
+            except Exception as e:
+                logger.error("Failed to write %s login attempts: %s", len(batch), e, exc_info=True)
+                return 0
+        
+        return len(batch)
+    
+    def _ensure_worker(self):
+        """Start the flush thread once per process (and again after a fork)."""
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        
+        with self._lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._run,
+                name='login-attempt-flusher',
+                daemon=True
+            )
+            self._thread.start()
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+login_attempt_buffer = LoginAttemptBuffer()
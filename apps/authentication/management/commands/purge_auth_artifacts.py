@@ -0,0 +1,33 @@
+"""
+Management command to purge old login attempts and expired OTP/reset tokens
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.core.management.base import BaseCommand
+from apps.authentication.tasks import purge_auth_artifacts
+
+
+class Command(BaseCommand):
+    help = 'Delete old login attempts and clear expired OTPs and password-reset tokens'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Delete login attempts older than this many days (default: 30)'
+        )
+    
+    def handle(self, *args, **options):
+        days_old = options['days']
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Purging login attempts older than {days_old} days and expired tokens...'
+        ))
+        
+        result = purge_auth_artifacts(days=days_old)
+        
+        self.stdout.write(f'Login attempts deleted: {result["login_attempts_deleted"]}')
+        self.stdout.write(f'Expired OTPs cleared: {result["otps_cleared"]}')
+        self.stdout.write(f'Expired reset tokens cleared: {result["reset_tokens_cleared"]}')
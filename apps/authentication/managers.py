@@ -5,6 +5,7 @@ Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
 from django.contrib.auth.models import BaseUserManager
+from django.db.models import Prefetch
 from django.utils import timezone
 
 
@@ -13,6 +14,14 @@ class UserManager(BaseUserManager):
     Custom user manager for FieldRino User model.
     """
     
+    @classmethod
+    def normalize_email(cls, email):
+        """
+        Store emails fully lowercased so lookups are a plain equality
+        match served by the unique index on users.email.
+        """
+        return (email or '').strip().lower()
+    
     def create_user(self, email, password=None, **extra_fields):
         """
         Create and return a regular user with an email and password.
@@ -44,8 +53,22 @@ class UserManager(BaseUserManager):
         
         return self.create_user(email, password, **extra_fields)
     
+    def with_direct_reports(self):
+        """
+        Return users with their direct reports' profiles (and those
+        profiles' users) prefetched, avoiding N+1 on direct_reports.
+        """
+        from .models import UserProfile
+        
+        return self.prefetch_related(
+            Prefetch(
+                'direct_reports',
+                queryset=UserProfile.objects.select_related('user')
+            )
+        )
+    
     def get_by_natural_key(self, username):
         """
         Get user by email (case insensitive).
         """
-        return self.get(email__iexact=username)
\ No newline at end of file
+        return self.get(email=self.normalize_email(username))
\ No newline at end of file
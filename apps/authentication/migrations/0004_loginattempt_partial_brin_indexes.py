@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:28
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0003_remove_user_authenticat_role_7fb088_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="loginattempt",
+            name="authenticat_email_97b940_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="loginattempt",
+            name="authenticat_ip_addr_1dccaa_idx",
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(
+                condition=models.Q(("success", False)),
+                fields=["email", "created_at"],
+                name="login_fail_email_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(
+                condition=models.Q(("success", False)),
+                fields=["ip_address", "created_at"],
+                name="login_fail_ip_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["created_at"], name="login_created_brin"
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0005_user_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="authenticat_email_d74434_idx",
+        ),
+    ]
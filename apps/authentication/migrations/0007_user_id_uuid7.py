@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:33
+
+import apps.core.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0006_remove_redundant_user_email_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="user",
+            name="id",
+            field=models.UUIDField(
+                default=apps.core.models.uuid7,
+                editable=False,
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
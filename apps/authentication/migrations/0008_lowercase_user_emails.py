@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:40
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def lowercase_user_emails(apps, schema_editor):
+    """
+    Lowercase stored emails, reporting accounts that only differ by case.
+    
+    Emails are looked up by exact (lowercase) match from now on, so a
+    mixed-case account that collides with another cannot be lowercased
+    without breaking the unique constraint, and can no longer log in,
+    verify an OTP or reset its password. Those accounts are left
+    untouched and their ids printed so an operator can merge them.
+    """
+    User = apps.get_model('authentication', 'User')
+    
+    schema_editor.execute("""
+        UPDATE authentication_user AS u
+        SET email = LOWER(u.email)
+        WHERE u.email <> LOWER(u.email)
+          AND NOT EXISTS (
+              SELECT 1 FROM authentication_user AS o
+              WHERE LOWER(o.email) = LOWER(u.email) AND o.id <> u.id
+          );
+    """)
+    
+    collisions = User.objects.annotate(
+        email_lower=Lower('email')
+    ).values('email_lower').annotate(
+        accounts=Count('id')
+    ).filter(accounts__gt=1)
+    
+    for collision in collisions:
+        accounts = User.objects.filter(
+            email__iexact=collision['email_lower']
+        ).order_by('created_at').values_list('id', 'email')
+        print(
+            "⚠️  Emails differ only by case; merge these users, the mixed-case "
+            "ones can no longer sign in: "
+            + ", ".join(f"{user_id} <{email}>" for user_id, email in accounts)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("authentication", "0007_user_id_uuid7"),
+    ]
+
+    operations = [
+        # Accounts whose emails differ only by case are left untouched so
+        # the unique constraint never fails mid-migration. Lookups are
+        # exact from now on, so the mixed-case account in each pair is
+        # locked out until merged; their ids are printed for an operator.
+        migrations.RunPython(lowercase_user_emails, migrations.RunPython.noop),
+    ]
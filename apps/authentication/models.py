@@ -4,19 +4,32 @@ Authentication Models
 Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
-import uuid
+import hashlib
+import random
+import string
+from functools import cached_property
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.utils import timezone
+from apps.core.models import uuid7
+from .cache import UserCache
 from .managers import UserManager
 
 
+_DIGITS = string.digits
+# CSPRNG backed by os.urandom; one instance shared by every set_otp call
+_SYS_RAND = random.SystemRandom()
+_ATTEMPT_STATUS = ('Failed', 'Success')
+
+
 class User(AbstractBaseUser, PermissionsMixin):
     """
     Custom User model for FieldRino.
     For multi-tenant role management, use TenantMember model.
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     email = models.EmailField(unique=True)
     
     # Personal information
@@ -68,54 +81,109 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        # email is unique=True, which already provides its B-tree index
         indexes = [
-            models.Index(fields=['email']),
+            # Trigram indexes back the admin's icontains search, which Django
+            # compiles to UPPER(column) LIKE '%term%'
+            GinIndex(OpClass(Upper('email'), name='gin_trgm_ops'), name='user_email_trgm'),
+            GinIndex(OpClass(Upper('first_name'), name='gin_trgm_ops'), name='user_first_name_trgm'),
+            GinIndex(OpClass(Upper('last_name'), name='gin_trgm_ops'), name='user_last_name_trgm'),
         ]
         # Fix reverse accessor conflicts
         default_related_name = 'fieldrino_users'
     
     def __str__(self):
+        return self._display
+    
+    @cached_property
+    def _display(self):
+        """Formatted once per instance; admin renders __str__ for every row link."""
         return f"{self.first_name} {self.last_name} ({self.email})"
     
-    @property
+    @cached_property
     def full_name(self):
         """Return full name."""
         return f"{self.first_name} {self.last_name}".strip()
     
 
     
+    @staticmethod
+    def new_otp_fields(purpose, length=6, now=None):
+        """Generate a fresh OTP as field values, e.g. for create_user()."""
+        now = now or timezone.now()
+        return {
+            'otp_code': ''.join(_SYS_RAND.choices(_DIGITS, k=length)),
+            'otp_expires': now + timezone.timedelta(minutes=10),  # 10 minutes
+            'otp_purpose': purpose,
+        }
+    
+    @staticmethod
+    def hash_reset_token(token):
+        """
+        Digest of a password reset token; only the digest is stored, so a
+        leaked users table holds no usable tokens.
+        """
+        return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    
     def set_otp(self, purpose, length=6):
         """Generate and set OTP for specific purpose."""
-        import random
-        import string
+        now = timezone.now()
+        for field, value in self.new_otp_fields(purpose, length, now).items():
+            setattr(self, field, value)
+        self.updated_at = now
         
-        self.otp_code = ''.join(random.choices(string.digits, k=length))
-        self.otp_expires = timezone.now() + timezone.timedelta(minutes=10)  # 10 minutes
-        self.otp_purpose = purpose
-        self.save()
+        # Persist only the OTP columns; skips the full-row save and post_save signals
+        type(self).objects.filter(pk=self.pk).update(
+            otp_code=self.otp_code,
+            otp_expires=self.otp_expires,
+            otp_purpose=self.otp_purpose,
+            updated_at=self.updated_at,
+        )
+        UserCache.invalidate_user(self.email, self.pk)
         
         return self.otp_code
     
+    @classmethod
+    def consume_otp(cls, email, code, purpose, now=None, user_id=None):
+        """
+        Verify and clear an OTP with a single conditional UPDATE.
+        
+        Returns the number of rows updated (0 or 1); two concurrent requests
+        can never both consume the same code.
+        """
+        if not code:
+            return 0
+        
+        now = now or timezone.now()
+        updated = cls.objects.filter(
+            email=email,
+            otp_code=code,
+            otp_purpose=purpose,
+            otp_expires__gt=now
+        ).update(**cls._consumed_otp_values(purpose, now))
+        
+        if updated:
+            UserCache.invalidate_user(email, user_id)
+        return updated
+    
+    @staticmethod
+    def _consumed_otp_values(purpose, now):
+        """Column values written when an OTP is consumed."""
+        values = {'otp_code': '', 'otp_expires': None, 'otp_purpose': '', 'updated_at': now}
+        if purpose == 'email_verification':
+            values.update(is_verified=True, email_verified_at=now)
+        return values
+    
     def verify_otp(self, code, purpose):
         """Verify OTP code."""
-        if (self.otp_code == code and 
-            self.otp_purpose == purpose and 
-            self.otp_expires and 
-            timezone.now() < self.otp_expires):
-            
-            # Clear OTP after successful verification
-            self.otp_code = ''
-            self.otp_expires = None
-            self.otp_purpose = ''
-            
-            if purpose == 'email_verification':
-                self.is_verified = True
-                self.email_verified_at = timezone.now()
-            
-            self.save()
-            return True
+        now = timezone.now()
+        if not type(self).consume_otp(self.email, code, purpose, now=now, user_id=self.pk):
+            return False
         
-        return False
+        # Mirror the cleared columns on this instance
+        for field, value in self._consumed_otp_values(purpose, now).items():
+            setattr(self, field, value)
+        return True
     
 
 
@@ -188,10 +256,37 @@ class LoginAttempt(models.Model):
         verbose_name = 'Login Attempt'
         verbose_name_plural = 'Login Attempts'
         indexes = [
-            models.Index(fields=['email', 'created_at']),
-            models.Index(fields=['ip_address', 'created_at']),
+            # Rate-limit lookups only care about recent failures
+            models.Index(
+                fields=['email', 'created_at'],
+                condition=models.Q(success=False),
+                name='login_fail_email_idx'
+            ),
+            models.Index(
+                fields=['ip_address', 'created_at'],
+                condition=models.Q(success=False),
+                name='login_fail_ip_idx'
+            ),
+            # Append-only table, so created_at correlates with physical order
+            BrinIndex(fields=['created_at'], name='login_created_brin'),
         ]
     
+    @classmethod
+    def log(cls, email, ip_address, user_agent='', success=False, failure_reason=''):
+        """
+        Record a login attempt without blocking the request.
+        Rows are buffered and written in bulk by LoginAttemptBuffer.
+        """
+        from .login_attempts import login_attempt_buffer
+        
+        login_attempt_buffer.add(cls(
+            email=email,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            success=success,
+            failure_reason=failure_reason
+        ))
+    
     def __str__(self):
-        status = "Success" if self.success else "Failed"
+        status = _ATTEMPT_STATUS[self.success]
         return f"{status} login attempt for {self.email} at {self.created_at}"
\ No newline at end of file
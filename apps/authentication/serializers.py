@@ -4,12 +4,57 @@ Authentication Serializers
 Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
+import hmac
+
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
+from django.db import IntegrityError, transaction
 from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from . import throttle
+from .cache import TokenDenylist, UserCache
 from .models import User, UserProfile, LoginAttempt
 
+# Only its get_ident() is used, which reads NUM_PROXIES from DRF settings
+_THROTTLE_IDENT = BaseThrottle()
+
+
+def get_client_ip(request):
+    """Get client IP address (parsed once per request)."""
+    if not request:
+        return '127.0.0.1'
+    
+    ip = getattr(request, '_client_ip', None)
+    if ip is not None:
+        return ip
+    
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.partition(',')[0].strip()
+    else:
+        ip = request.META.get('REMOTE_ADDR')
+    request._client_ip = ip
+    return ip
+
+
+def get_throttle_ip(request):
+    """
+    Get the client IP to rate limit on.
+    
+    get_client_ip trusts the first X-Forwarded-For hop, which the client
+    writes itself; that is fine for logging but would let a rotating
+    header dodge every per-IP limit. This uses DRF's throttle identity:
+    REMOTE_ADDR, or with REST_FRAMEWORK['NUM_PROXIES'] set, the hop our
+    own proxies appended.
+    """
+    if not request:
+        return '127.0.0.1'
+    return _THROTTLE_IDENT.get_ident(request)
+
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """
@@ -18,6 +63,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
     
+    DUPLICATE_EMAIL_MESSAGE = "A user with this email already exists."
+    
     class Meta:
         model = User
         fields = [
@@ -33,22 +80,36 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def validate_email(self, value):
         """Validate email is unique."""
-        if User.objects.filter(email__iexact=value).exists():
-            raise serializers.ValidationError("A user with this email already exists.")
-        return value.lower()
+        value = value.lower()
+        # Ask the database, not the email lookup cache: a cached miss can
+        # outlive the user it describes
+        if User.objects.filter(email=value).exists():
+            raise serializers.ValidationError(self.DUPLICATE_EMAIL_MESSAGE)
+        return value
     
     def create(self, validated_data):
         """Create user with validated data."""
         validated_data.pop('password_confirm')
         password = validated_data.pop('password')
+        email = User.objects.normalize_email(validated_data.pop('email'))
         
-        user = User.objects.create_user(
-            password=password,
+        # The email verification OTP goes into the same INSERT
+        user = User(
+            email=email,
+            **User.new_otp_fields('email_verification'),
             **validated_data
         )
+        # Hash before opening the transaction so the KDF never runs
+        # while the connection sits inside one
+        user.set_password(password)
         
-        # Generate OTP for email verification
-        user.set_otp('email_verification')
+        try:
+            with transaction.atomic():
+                # The post_save signal creates the profile in the same transaction
+                user.save()
+        except IntegrityError:
+            # A concurrent registration took the email after validate_email
+            raise serializers.ValidationError({'email': [self.DUPLICATE_EMAIL_MESSAGE]})
         
         return user
 
@@ -70,8 +131,16 @@ class LoginSerializer(serializers.Serializer):
             # Get request for IP tracking
             request = self.context.get('request')
             ip_address = self.get_client_ip(request)
+            throttle_ip = get_throttle_ip(request)
             user_agent = request.META.get('HTTP_USER_AGENT', '') if request else ''
             
+            # Refuse before paying for a password hash once this account or
+            # IP has too many recent failures
+            throttle.ensure_not_limited(
+                'login', email, throttle_ip,
+                throttle.LOGIN_ACCOUNT_LIMIT, throttle.LOGIN_IP_LIMIT
+            )
+            
             # Authenticate user
             user = authenticate(
                 request=request,
@@ -80,7 +149,7 @@ class LoginSerializer(serializers.Serializer):
             )
             
             # Log login attempt
-            LoginAttempt.objects.create(
+            LoginAttempt.log(
                 email=email,
                 ip_address=ip_address,
                 user_agent=user_agent,
@@ -88,13 +157,22 @@ class LoginSerializer(serializers.Serializer):
                 failure_reason='' if user else 'Invalid credentials'
             )
             
+            if user is None:
+                throttle.record_failure(
+                    'login', email, throttle_ip,
+                    throttle.LOGIN_ACCOUNT_LIMIT, throttle.LOGIN_IP_LIMIT
+                )
+            
             if user:
                 if not user.is_active:
                     raise serializers.ValidationError("User account is disabled.")
                 
-                # Update last login
-                user.last_login_at = timezone.now()
-                user.save(update_fields=['last_login_at'])
+                # Unverified users are turned away by the view; only real
+                # logins update last login, with a bare UPDATE (no post_save)
+                if user.is_verified:
+                    user.last_login_at = timezone.now()
+                    User.objects.filter(pk=user.pk).update(last_login_at=user.last_login_at)
+                    UserCache.invalidate_user(user.email, user.pk)
                 
                 attrs['user'] = user
             else:
@@ -106,15 +184,7 @@ class LoginSerializer(serializers.Serializer):
     
     def get_client_ip(self, request):
         """Get client IP address."""
-        if not request:
-            return '127.0.0.1'
-        
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0]
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-        return ip
+        return get_client_ip(request)
 
 
 class PasswordResetRequestSerializer(serializers.Serializer):
@@ -124,14 +194,13 @@ class PasswordResetRequestSerializer(serializers.Serializer):
     email = serializers.EmailField()
     
     def validate_email(self, value):
-        """Validate email exists."""
-        try:
-            user = User.objects.get(email__iexact=value)
-            self.user = user
-            return value.lower()
-        except User.DoesNotExist:
-            # Don't reveal if email exists or not for security
-            return value.lower()
+        """Normalize the email; whether it exists is never checked here."""
+        value = value.lower()
+        throttle.check(
+            'otp:send', value, get_throttle_ip(self.context.get('request')),
+            throttle.OTP_SEND_ACCOUNT_LIMIT, throttle.OTP_SEND_IP_LIMIT
+        )
+        return value
 
 
 class PasswordResetVerifyOTPSerializer(serializers.Serializer):
@@ -146,14 +215,19 @@ class PasswordResetVerifyOTPSerializer(serializers.Serializer):
         email = attrs['email'].lower()
         otp_code = attrs['otp_code']
         
-        try:
-            user = User.objects.get(email__iexact=email)
-            if not user.verify_otp(otp_code, 'password_reset'):
-                raise serializers.ValidationError("Invalid or expired OTP code.")
-            attrs['user'] = user
-        except User.DoesNotExist:
+        throttle.check(
+            'otp:password_reset', email, get_throttle_ip(self.context.get('request')),
+            throttle.OTP_ACCOUNT_LIMIT, throttle.OTP_IP_LIMIT
+        )
+        
+        user = UserCache.get_user_by_email(email)
+        if user is None:
             raise serializers.ValidationError("Invalid email or OTP code.")
         
+        if not user.verify_otp(otp_code, 'password_reset'):
+            raise serializers.ValidationError("Invalid or expired OTP code.")
+        
+        attrs['user'] = user
         return attrs
 
 
@@ -175,21 +249,26 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         email = attrs['email'].lower()
         reset_token = attrs['reset_token']
         
-        try:
-            user = User.objects.get(email__iexact=email)
-            
-            # Verify reset token
-            if not user.password_reset_token or user.password_reset_token != reset_token:
-                raise serializers.ValidationError("Invalid or expired reset token.")
-            
-            # Check if token is expired (valid for 15 minutes)
-            if not user.password_reset_expires or user.password_reset_expires < timezone.now():
-                raise serializers.ValidationError("Reset token has expired. Please request a new one.")
-            
-            attrs['user'] = user
-        except User.DoesNotExist:
+        user = UserCache.get_user_by_email(email)
+        if user is None:
             raise serializers.ValidationError("Invalid email or reset token.")
         
+        # The cached user carries no reset columns; read them from the database
+        stored_token, expires = User.objects.filter(pk=user.pk).values_list(
+            'password_reset_token', 'password_reset_expires'
+        ).first() or ('', None)
+        
+        # Verify reset token
+        if not stored_token or not hmac.compare_digest(
+            stored_token.encode(), User.hash_reset_token(reset_token).encode()
+        ):
+            raise serializers.ValidationError("Invalid or expired reset token.")
+        
+        # Check if token is expired (valid for 15 minutes)
+        if not expires or expires < timezone.now():
+            raise serializers.ValidationError("Reset token has expired. Please request a new one.")
+        
+        attrs['user'] = user
         return attrs
 
 
@@ -205,18 +284,22 @@ class EmailVerificationSerializer(serializers.Serializer):
         email = attrs['email'].lower()
         otp_code = attrs['otp_code']
         
-        try:
-            user = User.objects.get(email__iexact=email)
-            if user.is_verified:
-                raise serializers.ValidationError("Email is already verified.")
-            
-            if not user.verify_otp(otp_code, 'email_verification'):
-                raise serializers.ValidationError("Invalid or expired OTP code.")
-            
-            attrs['user'] = user
-        except User.DoesNotExist:
+        throttle.check(
+            'otp:email_verification', email, get_throttle_ip(self.context.get('request')),
+            throttle.OTP_ACCOUNT_LIMIT, throttle.OTP_IP_LIMIT
+        )
+        
+        user = UserCache.get_user_by_email(email)
+        if user is None:
             raise serializers.ValidationError("Invalid email or OTP code.")
         
+        if user.is_verified:
+            raise serializers.ValidationError("Email is already verified.")
+        
+        if not user.verify_otp(otp_code, 'email_verification'):
+            raise serializers.ValidationError("Invalid or expired OTP code.")
+        
+        attrs['user'] = user
         return attrs
 
 
@@ -229,23 +312,14 @@ class ResendOTPSerializer(serializers.Serializer):
         choices=['email_verification', 'password_reset']
     )
     
-    def validate(self, attrs):
-        """Validate email exists."""
-        email = attrs['email'].lower()
-        purpose = attrs['purpose']
-        
-        try:
-            user = User.objects.get(email__iexact=email)
-            
-            if purpose == 'email_verification' and user.is_verified:
-                raise serializers.ValidationError("Email is already verified.")
-            
-            attrs['user'] = user
-        except User.DoesNotExist:
-            # Don't reveal if email exists for security
-            pass
-        
-        return attrs
+    def validate_email(self, value):
+        """Normalize the email; whether it exists is never checked here."""
+        value = value.lower()
+        throttle.check(
+            'otp:send', value, get_throttle_ip(self.context.get('request')),
+            throttle.OTP_SEND_ACCOUNT_LIMIT, throttle.OTP_SEND_IP_LIMIT
+        )
+        return value
 
 
 class ChangePasswordSerializer(serializers.Serializer):
@@ -269,6 +343,33 @@ class ChangePasswordSerializer(serializers.Serializer):
         return attrs
 
 
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Token refresh that rejects denylisted refresh tokens and, when refresh
+    tokens rotate, denylists the one being exchanged.
+    """
+    
+    def validate(self, attrs):
+        """Validate the refresh token and issue new tokens."""
+        refresh = self.token_class(attrs['refresh'])
+        if TokenDenylist.contains(refresh):
+            raise InvalidToken("Token has been revoked")
+        
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                TokenDenylist.add(refresh)
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            
+            data['refresh'] = str(refresh)
+        
+        return data
+
+
 class UserSerializer(serializers.ModelSerializer):
     """
     Serializer for user information.
@@ -311,30 +412,35 @@ class UserSerializer(serializers.ModelSerializer):
         # Otherwise, try to get from request (for authenticated requests)
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            from apps.tenants.models import TenantMember
-            membership = TenantMember.objects.filter(
-                user=obj,
-                is_active=True
-            ).first()
+            membership = self._get_active_membership(obj)
             if membership:
                 return membership.role
             
-            # Check if user is a customer
-            try:
-                from apps.tenants.models import Tenant
-                from django_tenants.utils import schema_context
-                for tenant in Tenant.objects.all():
-                    try:
-                        with schema_context(tenant.schema_name):
-                            from apps.facilities.models import Customer
-                            if Customer.objects.filter(user=obj).exists():
-                                return 'customer'
-                    except Exception:
-                        continue
-            except Exception:
-                pass
+            # Check if user is a customer (via the customer tenant index)
+            from apps.core.permissions import get_customer_tenant
+            tenant, _ = get_customer_tenant(obj, scan=False)
+            if tenant:
+                return 'customer'
         return None
     
+    def _get_active_membership(self, obj):
+        """
+        Return the user's active TenantMember, querying once per user.
+        
+        Every tenant-specific field reads the same membership; caching it
+        on the serializer (shared by all rows of a many=True list) avoids
+        one query per field.
+        """
+        if not hasattr(self, '_membership_cache'):
+            self._membership_cache = {}
+        if obj.pk not in self._membership_cache:
+            from apps.tenants.models import TenantMember
+            self._membership_cache[obj.pk] = TenantMember.objects.filter(
+                user=obj,
+                is_active=True
+            ).first()
+        return self._membership_cache[obj.pk]
+    
     def get_employee_id(self, obj):
         """Get employee_id from current tenant membership."""
         membership = self.context.get('membership')
@@ -345,11 +451,7 @@ class UserSerializer(serializers.ModelSerializer):
             return tenant_membership.get('employee_id', '')
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            from apps.tenants.models import TenantMember
-            membership = TenantMember.objects.filter(
-                user=obj,
-                is_active=True
-            ).first()
+            membership = self._get_active_membership(obj)
             return membership.employee_id if membership else ''
         return ''
     
@@ -363,11 +465,7 @@ class UserSerializer(serializers.ModelSerializer):
             return tenant_membership.get('department', '')
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            from apps.tenants.models import TenantMember
-            membership = TenantMember.objects.filter(
-                user=obj,
-                is_active=True
-            ).first()
+            membership = self._get_active_membership(obj)
             return membership.department if membership else ''
         return ''
     
@@ -381,11 +479,7 @@ class UserSerializer(serializers.ModelSerializer):
             return tenant_membership.get('job_title', '')
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            from apps.tenants.models import TenantMember
-            membership = TenantMember.objects.filter(
-                user=obj,
-                is_active=True
-            ).first()
+            membership = self._get_active_membership(obj)
             return membership.job_title if membership else ''
         return ''
     
@@ -399,11 +493,7 @@ class UserSerializer(serializers.ModelSerializer):
         # Otherwise, try to get from request (for authenticated requests)
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
-            from apps.tenants.models import TenantMember
-            membership = TenantMember.objects.filter(
-                user=obj,
-                is_active=True
-            ).first()
+            membership = self._get_active_membership(obj)
             return membership.phone if membership else ''
         return ''
 
@@ -464,29 +554,30 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         profile_data = {k: v for k, v in validated_data.items() 
                        if k not in user_only_fields and k not in tenant_fields}
         
-        # Update user
-        if user_data:
-            for attr, value in user_data.items():
-                setattr(instance.user, attr, value)
-            instance.user.save()
-        
-        # Update tenant membership if tenant-specific fields are provided
-        if tenant_data:
-            request = self.context.get('request')
-            if request and hasattr(request, 'user'):
-                membership = TenantMember.objects.filter(
-                    user=instance.user,
-                    is_active=True
-                ).first()
-                if membership:
-                    for attr, value in tenant_data.items():
-                        setattr(membership, attr, value)
-                    membership.save()
-        
-        # Update profile
-        if profile_data:
-            for attr, value in profile_data.items():
-                setattr(instance, attr, value)
-            instance.save()
+        with transaction.atomic():
+            # Update user
+            if user_data:
+                for attr, value in user_data.items():
+                    setattr(instance.user, attr, value)
+                instance.user.save(update_fields=[*user_data, 'updated_at'])
+            
+            # Update tenant membership if tenant-specific fields are provided
+            if tenant_data:
+                request = self.context.get('request')
+                if request and hasattr(request, 'user'):
+                    membership = TenantMember.objects.filter(
+                        user=instance.user,
+                        is_active=True
+                    ).first()
+                    if membership:
+                        for attr, value in tenant_data.items():
+                            setattr(membership, attr, value)
+                        membership.save()
+            
+            # Update profile
+            if profile_data:
+                for attr, value in profile_data.items():
+                    setattr(instance, attr, value)
+                instance.save(update_fields=[*profile_data, 'updated_at'])
         
         return instance
\ No newline at end of file
@@ -1,8 +1,9 @@
 """
 Signals for authentication app.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .cache import UserCache
 from .models import User, UserProfile
 
 
@@ -12,38 +13,35 @@ def create_user_profile(sender, instance, created, **kwargs):
     Create a UserProfile automatically when a User is created.
     """
     if created:
-        UserProfile.objects.get_or_create(
+        # A user that was just inserted cannot have a profile yet
+        UserProfile.objects.create(
             user=instance,
-            defaults={
-                'timezone': 'UTC',
-                'language': 'en',
-                'email_notifications': True,
-                'sms_notifications': False,
-                'push_notifications': True,
-                'skills': [],
-                'certifications': [],
-            }
+            timezone='UTC',
+            language='en',
+            email_notifications=True,
+            sms_notifications=False,
+            push_notifications=True,
+            skills=[],
+            certifications=[],
         )
 
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
     """
-    Ensure profile exists when user is saved.
+    Drop the cached lookups whenever a user changes or is deleted.
     """
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
-    else:
-        # Create profile if it doesn't exist
-        UserProfile.objects.get_or_create(
-            user=instance,
-            defaults={
-                'timezone': 'UTC',
-                'language': 'en',
-                'email_notifications': True,
-                'sms_notifications': False,
-                'push_notifications': True,
-                'skills': [],
-                'certifications': [],
-            }
-        )
+    UserCache.invalidate_user(instance.email, instance.pk)
+
+
+@receiver(post_save, sender='tenants.TenantMember')
+@receiver(post_delete, sender='tenants.TenantMember')
+@receiver(post_save, sender='tenants.CustomerTenant')
+@receiver(post_delete, sender='tenants.CustomerTenant')
+def invalidate_user_data_cache(sender, instance, **kwargs):
+    """
+    Drop the cached /me/ payload when a user's tenant role or details change,
+    including when the customer index links (or unlinks) them to a tenant.
+    """
+    UserCache.invalidate_user_data(instance.user_id)
@@ -0,0 +1,143 @@
+"""
+Authentication Celery Tasks
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from celery import shared_task
+from django.core.mail import get_connection
+from django.utils import timezone
+import logging
+import smtplib
+
+from .models import User, LoginAttempt
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 5000
+
+# Mail connection kept open across tasks in this worker process
+_mail_connection = None
+
+
+def get_mail_connection():
+    """
+    Return this worker process's open mail connection, opening it on
+    first use, so consecutive emails skip the SMTP/TLS handshake and AUTH.
+    """
+    global _mail_connection
+    if _mail_connection is None:
+        _mail_connection = get_connection()
+        _mail_connection.open()
+    return _mail_connection
+
+
+def reset_mail_connection():
+    """Close and drop the worker's mail connection (e.g. after an error)."""
+    global _mail_connection
+    connection, _mail_connection = _mail_connection, None
+    if connection is not None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+@shared_task(bind=True, max_retries=3)
+def send_otp_email_task(self, user_id, purpose):
+    """
+    Send the OTP email for a user outside the request cycle.
+    
+    Only the id is queued; the current OTP is read from the database when
+    the task runs.
+    """
+    from apps.core.email_utils import send_otp_email
+    
+    try:
+        user = User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        logger.warning("User %s no longer exists, skipping %s OTP email", user_id, purpose)
+        return False
+    
+    try:
+        try:
+            return send_otp_email(user, purpose, connection=get_mail_connection())
+        except smtplib.SMTPServerDisconnected:
+            # The server timed out our idle connection; reconnect once
+            reset_mail_connection()
+            return send_otp_email(user, purpose, connection=get_mail_connection())
+    except Exception as e:
+        reset_mail_connection()
+        logger.error("Failed to send %s OTP email to %s: %s", purpose, user.email, e)
+        raise self.retry(exc=e, countdown=2 ** self.request.retries * 30)
+
+
+def issue_otp(email, purpose):
+    """
+    Generate a new OTP for the user with this email, if there is one that
+    should get it. Returns the user, or None.
+    """
+    user = User.objects.filter(email=User.objects.normalize_email(email)).first()
+    if user is None:
+        return None
+    if purpose == 'email_verification' and user.is_verified:
+        return None
+    
+    user.set_otp(purpose)
+    return user
+
+
+@shared_task
+def issue_otp_email_task(email, purpose):
+    """
+    Generate and email an OTP for an address, if it belongs to a user.
+    
+    Forgot-password and resend-OTP queue this for every valid request, so
+    they respond identically (and instantly) whether the account exists.
+    """
+    user = issue_otp(email, purpose)
+    if user is None:
+        logger.info("No %s OTP issued for %s", purpose, email)
+        return False
+    
+    send_otp_email_task.delay(str(user.pk), purpose)
+    return True
+
+
+@shared_task
+def purge_auth_artifacts(days=30):
+    """
+    Delete login attempts older than `days` and clear expired OTPs and
+    password-reset tokens, keeping the users table and its indexes lean.
+    """
+    now = timezone.now()
+    cutoff = now - timezone.timedelta(days=days)
+    
+    # Delete in batches so a large backlog never holds one long transaction
+    attempts_deleted = 0
+    while True:
+        batch = list(
+            LoginAttempt.objects.filter(created_at__lt=cutoff)
+            .values_list('pk', flat=True)[:PURGE_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        deleted, _ = LoginAttempt.objects.filter(pk__in=batch).delete()
+        attempts_deleted += deleted
+    
+    otps_cleared = User.objects.filter(otp_expires__lt=now).update(
+        otp_code='', otp_expires=None, otp_purpose=''
+    )
+    reset_tokens_cleared = User.objects.filter(password_reset_expires__lt=now).update(
+        password_reset_token='', password_reset_expires=None
+    )
+    
+    logger.info(
+        "Purged %s login attempts, cleared %s expired OTPs and %s expired reset tokens",
+        attempts_deleted, otps_cleared, reset_tokens_cleared
+    )
+    return {
+        'login_attempts_deleted': attempts_deleted,
+        'otps_cleared': otps_cleared,
+        'reset_tokens_cleared': reset_tokens_cleared,
+    }
@@ -0,0 +1,77 @@
+"""
+Authentication Rate Limiting
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.core.cache import cache
+from rest_framework import serializers
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# (limit, window in seconds) per account and per client IP
+OTP_ACCOUNT_LIMIT = (5, 5 * 60)
+OTP_IP_LIMIT = (20, 5 * 60)
+LOGIN_ACCOUNT_LIMIT = (10, 5 * 60)
+LOGIN_IP_LIMIT = (50, 5 * 60)
+# OTP emails sent (forgot-password and resend-OTP share one budget)
+OTP_SEND_ACCOUNT_LIMIT = (3, 10 * 60)
+OTP_SEND_IP_LIMIT = (20, 10 * 60)
+
+
+def get_throttle_keys(scope, email, ip_address):
+    """Return the (account, ip) counter keys for a scope."""
+    return f"throttle:{scope}:{email}", f"throttle:{scope}:ip:{ip_address}"
+
+
+def hit(key, window):
+    """
+    Count one attempt against a fixed window and return the new count.
+    
+    The window starts with the first attempt: add() only creates the key
+    (SET NX with a TTL on Redis) and incr() is atomic on the server.
+    """
+    cache.add(key, 0, window)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Key expired between add() and incr(); start a new window
+        cache.add(key, 1, window)
+        return 1
+
+
+def check(scope, email, ip_address, account_limit, ip_limit):
+    """
+    Count an attempt against both the account and the client IP, raising
+    a ValidationError once either is over its limit.
+    """
+    account_key, ip_key = get_throttle_keys(scope, email, ip_address)
+    if (hit(account_key, account_limit[1]) > account_limit[0]
+            or hit(ip_key, ip_limit[1]) > ip_limit[0]):
+        _reject(scope, email, ip_address)
+
+
+def ensure_not_limited(scope, email, ip_address, account_limit, ip_limit):
+    """
+    Raise a ValidationError if the account or IP already used up its
+    limit, without counting this attempt (see record_failure).
+    """
+    account_key, ip_key = get_throttle_keys(scope, email, ip_address)
+    counts = cache.get_many([account_key, ip_key])
+    if (counts.get(account_key, 0) >= account_limit[0]
+            or counts.get(ip_key, 0) >= ip_limit[0]):
+        _reject(scope, email, ip_address)
+
+
+def record_failure(scope, email, ip_address, account_limit, ip_limit):
+    """Count a failed attempt against both the account and the client IP."""
+    account_key, ip_key = get_throttle_keys(scope, email, ip_address)
+    hit(account_key, account_limit[1])
+    hit(ip_key, ip_limit[1])
+
+
+def _reject(scope, email, ip_address):
+    logger.warning("Throttled %s attempt for %s from %s", scope, email, ip_address)
+    raise serializers.ValidationError("Too many attempts. Please try again later.")
@@ -8,12 +8,22 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    # Ordered by request volume: the resolver tries patterns top to bottom
+    
     # Authentication
-    path('register/', views.register, name='register'),
     path('login/', views.login, name='login'),
-    path('logout/', views.logout, name='logout'),
     path('token/refresh/', views.TokenRefreshView.as_view(), name='token_refresh'),
     
+    # User profile
+    path('me/', views.me, name='me'),
+    path('profile/', views.profile, name='profile'),
+    path('profile/update/', views.update_profile, name='update_profile'),
+    path('profile/avatar/', views.upload_avatar, name='upload_avatar'),
+    
+    # Account
+    path('register/', views.register, name='register'),
+    path('logout/', views.logout, name='logout'),
+    
     # Email verification
     path('verify-email/', views.verify_email, name='verify_email'),
     path('resend-otp/', views.resend_otp, name='resend_otp'),
@@ -23,10 +33,4 @@ urlpatterns = [
     path('verify-reset-otp/', views.verify_reset_otp, name='verify_reset_otp'),  # Step 2: Verify OTP
     path('reset-password/', views.reset_password, name='reset_password'),  # Step 3: Set new password
     path('change-password/', views.change_password, name='change_password'),
-    
-    # User profile
-    path('me/', views.me, name='me'),
-    path('profile/', views.profile, name='profile'),
-    path('profile/update/', views.update_profile, name='update_profile'),
-    path('profile/avatar/', views.upload_avatar, name='upload_avatar'),
 ]
\ No newline at end of file
@@ -6,25 +6,35 @@ This source code is proprietary and confidential.
 """
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
-from django.db import transaction
-from django.core.mail import send_mail
+from django.db import connection, transaction
 from django.conf import settings
+from django.core.files.storage import default_storage
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiExample
+import hmac
 import logging
+import os
+import secrets
+import uuid
 
+from .authentication import validated_token_cache
+from .cache import TokenDenylist, UserCache
 from .models import User, UserProfile
+from .tasks import issue_otp, issue_otp_email_task, send_otp_email_task
 from .serializers import (
     UserRegistrationSerializer, LoginSerializer, PasswordResetRequestSerializer,
     PasswordResetVerifyOTPSerializer, PasswordResetConfirmSerializer, EmailVerificationSerializer,
     ResendOTPSerializer, ChangePasswordSerializer, UserSerializer,
-    UserProfileSerializer, UpdateProfileSerializer
+    UserProfileSerializer, UpdateProfileSerializer, RevocableTokenRefreshSerializer
 )
+from apps.core.email_utils import send_otp_email as send_template_otp
 from apps.core.responses import success_response, error_response
-from apps.core.permissions import IsAdminUser
+from apps.core.permissions import IsAdminUser, get_customer_tenant
+from apps.tenants.models import TenantMember
 from functools import wraps
 
 logger = logging.getLogger(__name__)
@@ -37,8 +47,6 @@ def public_schema_only(view_func):
     """
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        from django.db import connection
-        
         current_schema = connection.schema_name
         if current_schema != 'public':
             return error_response(
@@ -52,7 +60,10 @@ def public_schema_only(view_func):
 class TokenRefreshView(BaseTokenRefreshView):
     """
     Custom Token Refresh View with proper Swagger documentation.
+    Refresh tokens revoked on logout (or already rotated) are rejected.
     """
+    serializer_class = RevocableTokenRefreshSerializer
+    
     @extend_schema(
         tags=['Authentication'],
         summary='Refresh access token',
@@ -99,14 +110,47 @@ def get_tokens_for_user(user):
     }
 
 
+def revoke_tokens_on_commit(user):
+    """
+    Once the password change commits, revoke every token issued before it.
+    """
+    user_id, changed_at = user.pk, user.password_changed_at
+    transaction.on_commit(lambda: TokenDenylist.revoke_user_tokens(user_id, changed_at))
+
+
 def send_otp_email(user, purpose):
-    """Send OTP email to user using professional templates."""
-    from apps.core.email_utils import send_otp_email as send_template_otp
+    """
+    Queue the OTP email once the current transaction commits, so the
+    response never waits on SMTP. Sends inline if the broker is down.
+    """
+    user_id = str(user.pk)
+    
+    def queue():
+        try:
+            send_otp_email_task.delay(user_id, purpose)
+        except Exception as e:
+            logger.warning("Could not queue OTP email for %s: %s", user.email, e)
+            try:
+                send_template_otp(user, purpose)
+            except Exception as e:
+                logger.error("Failed to send OTP email: %s", e)
+    
+    transaction.on_commit(queue)
+
+
+def queue_otp_email(email, purpose):
+    """
+    Queue issuing and emailing an OTP for an address that may or may not
+    belong to a user, so the request does no lookup, write or SMTP.
+    Falls back to doing the work inline if the broker is down.
+    """
     try:
-        return send_template_otp(user, purpose)
+        issue_otp_email_task.delay(email, purpose)
     except Exception as e:
-        logger.error(f"Failed to send OTP email: {str(e)}")
-        return False
+        logger.warning("Could not queue %s OTP for %s: %s", purpose, email, e)
+        user = issue_otp(email, purpose)
+        if user is not None:
+            send_otp_email(user, purpose)
 
 
 @extend_schema(
@@ -154,43 +198,36 @@ def register(request):
         )
     
     try:
-        with transaction.atomic():
+        # The serializer commits the user and its profile in one transaction
+        try:
             user = serializer.save()
+        except ValidationError as e:
+            # Lost a race for the same email
+            return error_response(
+                message="Invalid registration data",
+                details=e.detail,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Generate JWT tokens
+        tokens = get_tokens_for_user(user)
+        
+        # Send verification email (queued to the Celery worker)
+        send_otp_email(user, 'email_verification')
+        logger.info("User registered: %s", user.email)
+        
+        return success_response(
+            data={
+                'user': UserSerializer(user).data,
+                'access': tokens['access'],
+                'refresh': tokens['refresh'],
+                'message': 'Registration successful. Please check your email for verification code.'
+            },
+            status_code=status.HTTP_201_CREATED
+        )
             
-            # Create user profile if it doesn't exist
-            UserProfile.objects.get_or_create(user=user)
-            
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-            refresh_token = str(refresh)
-            
-            # Send verification email
-            if send_otp_email(user, 'email_verification'):
-                logger.info(f"User registered: {user.email}")
-                
-                return success_response(
-                    data={
-                        'user': UserSerializer(user).data,
-                        'access': access_token,
-                        'refresh': refresh_token,
-                        'message': 'Registration successful. Please check your email for verification code.'
-                    },
-                    status_code=status.HTTP_201_CREATED
-                )
-            else:
-                return success_response(
-                    data={
-                        'user': UserSerializer(user).data,
-                        'access': access_token,
-                        'refresh': refresh_token,
-                        'message': 'Registration successful but failed to send verification email. Please try resending OTP.'
-                    },
-                    status_code=status.HTTP_201_CREATED
-                )
-                
     except Exception as e:
-        logger.error(f"Registration failed: {str(e)}", exc_info=True)
+        logger.error("Registration failed: %s", e, exc_info=True)
         return error_response(
             message="Registration failed. Please try again.",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -251,8 +288,6 @@ def login(request):
         tokens = get_tokens_for_user(user)
         
         # Get tenant membership information
-        from apps.tenants.models import TenantMember
-        from django.db import connection
         tenant_membership = None
         tenant_data = None
         
@@ -276,46 +311,28 @@ def login(request):
                     'slug': membership.tenant.slug,
                 }
             else:
-                # Check if user is a customer (customers don't have TenantMember records)
-                # We need to find which tenant schema has this customer
-                from apps.tenants.models import Tenant
-                from django_tenants.utils import schema_context
-                
-                logger.info(f"Checking customer profile for user: {user.email}")
-                
-                for tenant in Tenant.objects.all():
-                    try:
-                        logger.info(f"Checking tenant: {tenant.slug}")
-                        with schema_context(tenant.schema_name):
-                            from apps.facilities.models import Customer
-                            customer = Customer.objects.filter(user=user).first()
-                            if customer:
-                                # Found the customer's tenant
-                                logger.info(f"Found customer in tenant: {tenant.slug}")
-                                tenant_data = {
-                                    'id': str(tenant.id),
-                                    'name': tenant.name,
-                                    'slug': tenant.slug,
-                                }
-                                tenant_membership = {
-                                    'role': 'customer',
-                                    'employee_id': '',
-                                    'department': '',
-                                    'job_title': 'Customer',
-                                }
-                                break
-                    except Exception as ex:
-                        logger.warning(f"Error checking tenant {tenant.slug}: {str(ex)}")
-                        continue
-                        
-        except Exception as e:
-            logger.warning(f"Could not fetch tenant membership for {user.email}: {str(e)}")
+                # Check if user is a customer (customers don't have TenantMember records);
+                # the CustomerTenant index says which tenant schema has the customer.
+                # Users not indexed yet are searched for in the background.
+                customer_tenant, customer = get_customer_tenant(user, scan=False)
+                if customer:
+                    tenant_data = {
+                        'id': str(customer_tenant.id),
+                        'name': customer_tenant.name,
+                        'slug': customer_tenant.slug,
+                    }
+                    tenant_membership = {
+                        'role': 'customer',
+                        'employee_id': '',
+                        'department': '',
+                        'job_title': 'Customer',
+                    }
         
-        # Update last login
-        user.last_login_at = timezone.now()
-        user.save(update_fields=['last_login_at'])
+        except Exception as e:
+            logger.warning("Could not fetch tenant membership for %s: %s", user.email, e)
         
-        logger.info(f"User logged in: {user.email}")
+        # last_login_at was already recorded by LoginSerializer
+        logger.info("User logged in: %s", user.email)
         
         # Pass membership as context to UserSerializer
         serializer_context = {}
@@ -344,7 +361,7 @@ def login(request):
         )
         
     except Exception as e:
-        logger.error(f"Login failed: {str(e)}", exc_info=True)
+        logger.error("Login failed: %s", e, exc_info=True)
         return error_response(
             message="Login failed. Please try again.",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -376,28 +393,23 @@ def logout(request):
         
         if refresh_token:
             try:
-                token = RefreshToken(refresh_token)
-                # Try to blacklist if the extension is installed
-                if hasattr(token, 'blacklist'):
-                    token.blacklist()
-                else:
-                    # If blacklist not available, just validate the token
-                    # The token will expire naturally
-                    token.check_blacklist()
-            except AttributeError:
-                # Blacklist not installed, token will expire naturally
-                pass
+                TokenDenylist.add(RefreshToken(refresh_token))
             except Exception as token_error:
-                logger.warning(f"Token blacklist error: {str(token_error)}")
+                logger.warning("Token blacklist error: %s", token_error)
+        
+        # Revoke the access token used for this request as well
+        if request.auth is not None:
+            TokenDenylist.add(request.auth)
+            validated_token_cache.delete(validated_token_cache.make_key(request.auth.token))
         
-        logger.info(f"User logged out: {request.user.email}")
+        logger.info("User logged out: %s", request.user.email)
         
         return success_response(
             message="Logout successful"
         )
         
     except Exception as e:
-        logger.error(f"Logout failed: {str(e)}")
+        logger.error("Logout failed: %s", e)
         return error_response(
             message="Logout failed",
             status_code=status.HTTP_400_BAD_REQUEST
@@ -423,7 +435,7 @@ def verify_email(request):
     
     Note: Email verification is only available from the public schema (localhost).
     """
-    serializer = EmailVerificationSerializer(data=request.data)
+    serializer = EmailVerificationSerializer(data=request.data, context={'request': request})
     
     if not serializer.is_valid():
         return error_response(
@@ -435,7 +447,7 @@ def verify_email(request):
     try:
         user = serializer.validated_data['user']
         
-        logger.info(f"Email verified: {user.email}")
+        logger.info("Email verified: %s", user.email)
         
         return success_response(
             data={
@@ -445,7 +457,7 @@ def verify_email(request):
         )
         
     except Exception as e:
-        logger.error(f"Email verification failed: {str(e)}")
+        logger.error("Email verification failed: %s", e)
         return error_response(
             message="Email verification failed",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -471,7 +483,7 @@ def resend_otp(request):
     
     Note: OTP resend is only available from the public schema (localhost).
     """
-    serializer = ResendOTPSerializer(data=request.data)
+    serializer = ResendOTPSerializer(data=request.data, context={'request': request})
     
     if not serializer.is_valid():
         return error_response(
@@ -481,31 +493,19 @@ def resend_otp(request):
         )
     
     try:
-        user = serializer.validated_data.get('user')
-        purpose = serializer.validated_data['purpose']
+        # The lookup, new OTP and email all happen in the task
+        queue_otp_email(
+            serializer.validated_data['email'],
+            serializer.validated_data['purpose']
+        )
         
-        if user:
-            # Generate new OTP
-            user.set_otp(purpose)
-            
-            # Send OTP email
-            if send_otp_email(user, purpose):
-                return success_response(
-                    message="OTP sent successfully. Please check your email."
-                )
-            else:
-                return error_response(
-                    message="Failed to send OTP. Please try again.",
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Don't reveal if email exists, but return success for security
-            return success_response(
-                message="If the email exists, OTP has been sent."
-            )
+        # Same response whether or not the email exists
+        return success_response(
+            message="If the email exists, OTP has been sent."
+        )
             
     except Exception as e:
-        logger.error(f"Resend OTP failed: {str(e)}")
+        logger.error("Resend OTP failed: %s", e)
         return error_response(
             message="Failed to resend OTP",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -531,7 +531,7 @@ def forgot_password(request):
     
     Note: Password reset is only available from the public schema (localhost).
     """
-    serializer = PasswordResetRequestSerializer(data=request.data)
+    serializer = PasswordResetRequestSerializer(data=request.data, context={'request': request})
     
     if not serializer.is_valid():
         return error_response(
@@ -541,23 +541,16 @@ def forgot_password(request):
         )
     
     try:
-        user = getattr(serializer, 'user', None)
+        # The lookup, new OTP and email all happen in the task
+        queue_otp_email(serializer.validated_data['email'], 'password_reset')
         
-        if user:
-            # Generate OTP for password reset
-            user.set_otp('password_reset')
-            
-            # Send OTP email
-            if send_otp_email(user, 'password_reset'):
-                logger.info(f"Password reset OTP sent: {user.email}")
-            
         # Always return success for security (don't reveal if email exists)
         return success_response(
             message="If the email exists, a password reset code has been sent."
         )
         
     except Exception as e:
-        logger.error(f"Password reset request failed: {str(e)}")
+        logger.error("Password reset request failed: %s", e)
         return error_response(
             message="Failed to process password reset request",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -588,7 +581,7 @@ def verify_reset_otp(request):
     
     Note: Password reset is only available from the public schema (localhost).
     """
-    serializer = PasswordResetVerifyOTPSerializer(data=request.data)
+    serializer = PasswordResetVerifyOTPSerializer(data=request.data, context={'request': request})
     
     if not serializer.is_valid():
         return error_response(
@@ -601,15 +594,14 @@ def verify_reset_otp(request):
         user = serializer.validated_data['user']
         
         # Generate a secure reset token
-        import secrets
         reset_token = secrets.token_urlsafe(32)
         
         # Save reset token with 15 minute expiry
-        user.password_reset_token = reset_token
+        user.password_reset_token = User.hash_reset_token(reset_token)
         user.password_reset_expires = timezone.now() + timezone.timedelta(minutes=15)
-        user.save()
+        user.save(update_fields=['password_reset_token', 'password_reset_expires', 'updated_at'])
         
-        logger.info(f"Password reset OTP verified: {user.email}")
+        logger.info("Password reset OTP verified: %s", user.email)
         
         return success_response(
             message="OTP verified successfully. Use the reset token to set your new password.",
@@ -621,7 +613,7 @@ def verify_reset_otp(request):
         )
         
     except Exception as e:
-        logger.error(f"OTP verification failed: {str(e)}")
+        logger.error("OTP verification failed: %s", e)
         return error_response(
             message="OTP verification failed",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -663,26 +655,46 @@ def reset_password(request):
     
     try:
         user = serializer.validated_data['user']
+        token_digest = User.hash_reset_token(serializer.validated_data['reset_token'])
         new_password = serializer.validated_data['new_password']
         
-        # Set new password
-        user.set_password(new_password)
-        user.password_changed_at = timezone.now()
-        
-        # Clear reset token after use
-        user.password_reset_token = ''
-        user.password_reset_expires = None
-        
-        user.save()
+        with transaction.atomic():
+            # Lock the row and re-check the token: the serializer's read was
+            # unlocked, and concurrent requests must not both spend it
+            user = User.objects.select_for_update().get(pk=user.pk)
+            if (
+                not user.password_reset_token
+                or not hmac.compare_digest(user.password_reset_token, token_digest)
+                or not user.password_reset_expires
+                or user.password_reset_expires < timezone.now()
+            ):
+                return error_response(
+                    message="Invalid or expired reset token.",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            
+            # Set new password
+            user.set_password(new_password)
+            user.password_changed_at = timezone.now()
+            
+            # Clear reset token after use
+            user.password_reset_token = ''
+            user.password_reset_expires = None
+            
+            user.save(update_fields=[
+                'password', 'password_changed_at',
+                'password_reset_token', 'password_reset_expires', 'updated_at'
+            ])
+            revoke_tokens_on_commit(user)
         
-        logger.info(f"Password reset successful: {user.email}")
+        logger.info("Password reset successful: %s", user.email)
         
         return success_response(
             message="Password reset successful. You can now login with your new password."
         )
         
     except Exception as e:
-        logger.error(f"Password reset failed: {str(e)}")
+        logger.error("Password reset failed: %s", e)
         return error_response(
             message="Password reset failed",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -721,25 +733,40 @@ def change_password(request):
         user = request.user
         new_password = serializer.validated_data['new_password']
         
-        # Set new password
-        user.set_password(new_password)
-        user.password_changed_at = timezone.now()
-        user.save()
+        with transaction.atomic():
+            # Set new password
+            user.set_password(new_password)
+            user.password_changed_at = timezone.now()
+            user.save(update_fields=['password', 'password_changed_at', 'updated_at'])
+            revoke_tokens_on_commit(user)
         
-        logger.info(f"Password changed: {user.email}")
+        logger.info("Password changed: %s", user.email)
         
         return success_response(
             message="Password changed successfully"
         )
         
     except Exception as e:
-        logger.error(f"Password change failed: {str(e)}")
+        logger.error("Password change failed: %s", e)
         return error_response(
             message="Password change failed",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
+def get_user_profile(user):
+    """
+    Fetch a user's profile (with the user joined) in one query.
+    
+    Profiles are created by the User post_save signal; only accounts that
+    predate it can be missing one, so the INSERT stays off the hot path.
+    """
+    try:
+        return UserProfile.objects.select_related('user').get(user_id=user.id)
+    except UserProfile.DoesNotExist:
+        return UserProfile.objects.create(user=user)
+
+
 @extend_schema(
     tags=['Authentication'],
     summary='Get user profile',
@@ -760,7 +787,7 @@ def profile(request):
     """
     try:
         user = request.user
-        profile, created = UserProfile.objects.get_or_create(user=user)
+        profile = get_user_profile(user)
         
         serializer = UserProfileSerializer(profile, context={'request': request})
         
@@ -770,7 +797,7 @@ def profile(request):
         )
         
     except Exception as e:
-        logger.error(f"Profile retrieval failed: {str(e)}")
+        logger.error("Profile retrieval failed: %s", e)
         return error_response(
             message="Failed to retrieve profile",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -798,7 +825,7 @@ def update_profile(request):
     """
     try:
         user = request.user
-        profile, created = UserProfile.objects.get_or_create(user=user)
+        profile = get_user_profile(user)
         
         serializer = UpdateProfileSerializer(
             profile, 
@@ -816,10 +843,10 @@ def update_profile(request):
         
         serializer.save()
         
-        # Return updated profile with request context
+        # serializer.save() updated this instance in place; no refetch needed
         updated_profile = UserProfileSerializer(profile, context={'request': request}).data
         
-        logger.info(f"Profile updated: {user.email}")
+        logger.info("Profile updated: %s", user.email)
         
         return success_response(
             data=updated_profile,
@@ -827,13 +854,39 @@ def update_profile(request):
         )
         
     except Exception as e:
-        logger.error(f"Profile update failed: {str(e)}")
+        logger.error("Profile update failed: %s", e)
         return error_response(
             message="Profile update failed",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
 
+# Leading bytes of the accepted avatar formats
+_IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+)
+
+
+def sniff_image_extension(uploaded_file):
+    """
+    Return the file extension for an uploaded JPEG, PNG, GIF or WebP
+    image, judged by its first bytes, or None for anything else.
+    """
+    uploaded_file.seek(0)
+    head = uploaded_file.read(12)
+    uploaded_file.seek(0)
+    
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return '.webp'
+    for signature, extension in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
 @extend_schema(
     tags=['Authentication'],
     summary='Upload user avatar',
@@ -879,40 +932,35 @@ def upload_avatar(request):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
-        # Validate file type
-        allowed_types = ['image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp']
-        if avatar_file.content_type not in allowed_types:
+        # Validate file type from its leading bytes; content_type is client-supplied
+        file_extension = sniff_image_extension(avatar_file)
+        if file_extension is None:
             return error_response(
                 message="Invalid file type. Only JPEG, PNG, GIF, and WebP images are allowed",
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
         # Save the file
-        import os
-        from django.conf import settings
-        from django.core.files.storage import default_storage
-        
-        # Create uploads directory if it doesn't exist
-        upload_dir = os.path.join(settings.MEDIA_ROOT, 'avatars')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        import uuid
-        file_extension = os.path.splitext(avatar_file.name)[1]
+        # Generate unique filename (storage creates the directory as needed)
         filename = f"{request.user.id}_{uuid.uuid4().hex}{file_extension}"
         file_path = os.path.join('avatars', filename)
         
-        # Save file
+        # Save file; storage copies it chunk by chunk, and uploads over
+        # FILE_UPLOAD_MAX_MEMORY_SIZE were spooled to disk, never held in memory
         saved_path = default_storage.save(file_path, avatar_file)
         
-        # Generate URL
-        avatar_url = request.build_absolute_uri(settings.MEDIA_URL + saved_path)
+        # Generate URL; MEDIA_URL is already absolute (the CDN) in production,
+        # locally it is a path on this host
+        media_url = settings.MEDIA_URL
+        if not media_url.startswith(('http://', 'https://')):
+            media_url = f"{request.scheme}://{request.get_host()}{media_url}"
+        avatar_url = f"{media_url}{saved_path}"
         
         # Update user avatar_url
         request.user.avatar_url = avatar_url
-        request.user.save()
+        request.user.save(update_fields=['avatar_url', 'updated_at'])
         
-        logger.info(f"Avatar uploaded for user: {request.user.email}")
+        logger.info("Avatar uploaded for user: %s", request.user.email)
         
         return success_response(
             data={'avatar_url': avatar_url},
@@ -920,7 +968,7 @@ def upload_avatar(request):
         )
         
     except Exception as e:
-        logger.error(f"Avatar upload failed: {str(e)}")
+        logger.error("Avatar upload failed: %s", e)
         return error_response(
             message="Failed to upload avatar",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -946,15 +994,23 @@ def me(request):
     Note: User info is only available from the public schema (localhost).
     """
     try:
-        serializer = UserSerializer(request.user, context={'request': request})
+        # The tenant role fields cost several queries; reuse them until the
+        # user or one of their memberships changes
+        data = UserCache.get_cached_user_data(request.user.pk)
+        if data is None:
+            # Serialize a fresh row, never a cached copy of the user, so a
+            # stale name or avatar cannot be written back for minutes
+            user = User.objects.get(pk=request.user.pk)
+            data = UserSerializer(user, context={'request': request}).data
+            UserCache.cache_user_data(user.pk, data)
         
         return success_response(
-            data=serializer.data,
+            data=data,
             message="User information retrieved successfully"
         )
         
     except Exception as e:
-        logger.error(f"User info retrieval failed: {str(e)}")
+        logger.error("User info retrieval failed: %s", e)
         return error_response(
             message="Failed to retrieve user information",
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -5,7 +5,7 @@ Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
 from django.contrib import admin
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from .models import SubscriptionPlan, Subscription
 
 
@@ -51,6 +51,7 @@ class SubscriptionAdmin(admin.ModelAdmin):
         'tenant', 'plan', 'status', 'stripe_link', 'created_at'
     ]
     list_filter = ['status', 'plan']
+    list_select_related = ['tenant', 'plan']
     search_fields = ['tenant__name', 'stripe_subscription_id', 'stripe_customer_id']
     readonly_fields = ['created_at', 'updated_at', 'stripe_dashboard_link']
     
@@ -92,14 +93,15 @@ class SubscriptionAdmin(admin.ModelAdmin):
         
         if obj.stripe_subscription_id:
             sub_url = f"https://dashboard.stripe.com/subscriptions/{obj.stripe_subscription_id}"
-            links.append(format_html('<a href="{}" target="_blank">View Subscription</a>', sub_url))
+            links.append((sub_url, 'View Subscription'))
         
         if obj.stripe_customer_id:
             cust_url = f"https://dashboard.stripe.com/customers/{obj.stripe_customer_id}"
-            links.append(format_html('<a href="{}" target="_blank">View Customer</a>', cust_url))
+            links.append((cust_url, 'View Customer'))
         
         if links:
-            return format_html(' | '.join(links))
+            # Escapes each link once; the joined markup is not re-parsed
+            return format_html_join(' | ', '<a href="{}" target="_blank">{}</a>', links)
         return '-'
     stripe_dashboard_link.short_description = 'Stripe Dashboard Links'
 
@@ -2,12 +2,19 @@
 Management command to check billing system health and display metrics.
 
 Usage:
-    python manage.py check_billing_health [--alerts-only]
+    python manage.py check_billing_health [--alerts-only] [--no-cache]
 """
 from django.core.management.base import BaseCommand
 from apps.billing.monitoring import BillingMetrics, get_billing_dashboard_data
 import json
 
+# Alert severity -> (style name, icon); anything else is shown as a notice
+_ALERT_STYLES = {
+    'critical': ('ERROR', '✗'),
+    'warning': ('WARNING', '⚠'),
+}
+_DEFAULT_ALERT_STYLE = ('NOTICE', 'ℹ')
+
 
 class Command(BaseCommand):
     help = 'Check billing system health and display metrics'
@@ -23,6 +30,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Output in JSON format',
         )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Recompute the dashboard instead of using the cached copy (up to 60s old)',
+        )
 
     def handle(self, *args, **options):
         alerts_only = options['alerts_only']
@@ -43,24 +55,18 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING(f'Found {len(alerts)} alert(s):'))
             self.stdout.write('')
             
+            write = self.stdout.write
             for alert in alerts:
                 severity = alert['severity']
-                if severity == 'critical':
-                    style = self.style.ERROR
-                    icon = '✗'
-                elif severity == 'warning':
-                    style = self.style.WARNING
-                    icon = '⚠'
-                else:
-                    style = self.style.NOTICE
-                    icon = 'ℹ'
+                style_name, icon = _ALERT_STYLES.get(severity, _DEFAULT_ALERT_STYLE)
+                style = getattr(self.style, style_name)
                 
-                self.stdout.write(style(f'{icon} [{severity.upper()}] {alert["message"]}'))
+                write(style(f'{icon} [{severity.upper()}] {alert["message"]}'))
             
             return
         
         # Full dashboard
-        dashboard = get_billing_dashboard_data()
+        dashboard = get_billing_dashboard_data(use_cache=not options['no_cache'])
         
         if json_output:
             self.stdout.write(json.dumps(dashboard, indent=2, default=str))
@@ -126,16 +132,12 @@ class Command(BaseCommand):
         alerts = dashboard['alerts']
         if alerts:
             self.stdout.write(self.style.WARNING(f'⚠ Active Alerts ({len(alerts)})'))
+            write = self.stdout.write
             for alert in alerts:
-                severity = alert['severity']
-                if severity == 'critical':
-                    style = self.style.ERROR
-                elif severity == 'warning':
-                    style = self.style.WARNING
-                else:
-                    style = self.style.NOTICE
+                style_name, _ = _ALERT_STYLES.get(alert['severity'], _DEFAULT_ALERT_STYLE)
+                style = getattr(self.style, style_name)
                 
-                self.stdout.write(style(f"  • {alert['message']}"))
+                write(style(f"  • {alert['message']}"))
             self.stdout.write('')
         else:
             self.stdout.write(self.style.SUCCESS('✓ No Active Alerts'))
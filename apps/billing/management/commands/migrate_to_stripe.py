@@ -6,17 +6,33 @@ This script:
 2. Creates Stripe subscriptions for active subscriptions
 3. Updates local records with Stripe IDs
 
+Tenants are migrated concurrently (see --workers): each one is a few
+sequential Stripe round trips, so the run is bound by network latency.
+
 Usage:
-    python manage.py migrate_to_stripe [--dry-run]
+    python manage.py migrate_to_stripe [--dry-run] [--workers N]
 """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Prefetch, Q
 from apps.billing.models import Subscription
+from apps.tenants.models import TenantMember
 from apps.billing.stripe_service import StripeService, STRIPE_ENABLED
 import logging
 
+# Stripe is optional; without it STRIPE_ENABLED is False and handle() exits early
+try:
+    import stripe
+except ImportError:
+    stripe = None
+
 logger = logging.getLogger(__name__)
 
+# Subscriptions fetched (and handed to the workers) per batch
+MIGRATION_CHUNK_SIZE = 500
+
 
 class Command(BaseCommand):
     help = 'Migrate existing subscriptions to Stripe'
@@ -27,9 +43,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Run migration in dry-run mode (no changes made)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Number of tenants migrated in parallel (mind Stripe API rate limits)',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
+        workers = max(1, options['workers'])
         
         if dry_run:
             self.stdout.write(self.style.WARNING('Running in DRY-RUN mode - no changes will be made'))
@@ -38,11 +61,21 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('Stripe is not enabled. Please configure STRIPE_SECRET_KEY.'))
             return
         
-        # Get subscriptions that need migration (no Stripe IDs)
+        # Get subscriptions that need migration (no Stripe IDs), with each
+        # tenant, plan and active owner (with user) loaded up front rather
+        # than queried per subscription
         subscriptions_to_migrate = Subscription.objects.filter(
-            stripe_subscription_id__isnull=True
-        ) | Subscription.objects.filter(
-            stripe_subscription_id=''
+            Q(stripe_subscription_id__isnull=True) | Q(stripe_subscription_id='')
+        ).select_related(
+            'tenant', 'plan'
+        ).prefetch_related(
+            Prefetch(
+                'tenant__members',
+                queryset=TenantMember.objects.filter(
+                    role='owner', is_active=True
+                ).select_related('user'),
+                to_attr='owner_memberships'
+            )
         )
         
         total_count = subscriptions_to_migrate.count()
@@ -56,112 +89,35 @@ class Command(BaseCommand):
         success_count = 0
         error_count = 0
         
-        for subscription in subscriptions_to_migrate:
-            tenant = subscription.tenant
-            
-            self.stdout.write(f'\nMigrating subscription for tenant: {tenant.name} (ID: {tenant.id})')
-            
-            try:
-                # Get tenant owner for customer creation
-                owner_membership = tenant.tenant_memberships.filter(
-                    role='owner',
-                    is_active=True
-                ).first()
-                
-                if not owner_membership:
-                    self.stdout.write(self.style.WARNING(
-                        f'  ⚠ No owner found for tenant {tenant.name}, skipping'
-                    ))
-                    error_count += 1
-                    continue
-                
-                user = owner_membership.user
-                
-                if dry_run:
-                    self.stdout.write(f'  [DRY-RUN] Would create Stripe customer for: {user.email}')
-                    self.stdout.write(f'  [DRY-RUN] Would create Stripe subscription for plan: {subscription.plan.name}')
-                    success_count += 1
-                    continue
+        # Stripe calls are I/O bound, so threads overlap their round trips.
+        # Each tenant's output is collected and written as one block.
+        # Rows are streamed a batch at a time, so memory stays bounded
+        # however many tenants there are.
+        subscriptions = subscriptions_to_migrate.iterator(chunk_size=MIGRATION_CHUNK_SIZE)
+        self._worker_connections = []
+        with ThreadPoolExecutor(max_workers=workers, initializer=self._init_worker) as executor:
+            while True:
+                batch = list(islice(subscriptions, MIGRATION_CHUNK_SIZE))
+                if not batch:
+                    break
                 
-                with transaction.atomic():
-                    # Step 1: Create or get Stripe customer
-                    self.stdout.write(f'  Creating Stripe customer for: {user.email}')
-                    customer = StripeService.get_or_create_customer(tenant, user)
-                    customer_id = customer.id
-                    self.stdout.write(self.style.SUCCESS(f'  ✓ Stripe customer created: {customer_id}'))
-                    
-                    # Step 2: Determine billing cycle (default to monthly if not set)
-                    billing_cycle = 'monthly'  # Default since we removed the field
-                    
-                    # Step 3: Get price ID
-                    price_id = subscription.plan.stripe_price_id_monthly
-                    if not price_id:
-                        self.stdout.write(self.style.ERROR(
-                            f'  ✗ No Stripe price ID configured for plan {subscription.plan.name}'
-                        ))
+                futures = [
+                    executor.submit(self._migrate_one, subscription, dry_run)
+                    for subscription in batch
+                ]
+                for future in as_completed(futures):
+                    ok, lines = future.result()
+                    for line in lines:
+                        self.stdout.write(line)
+                    if ok:
+                        success_count += 1
+                    else:
                         error_count += 1
-                        continue
-                    
-                    # Step 4: Determine trial end
-                    trial_end = None
-                    if tenant.is_trial_active:
-                        trial_end = tenant.trial_ends_at
-                        self.stdout.write(f'  Trial active until: {trial_end}')
-                    
-                    # Step 5: Create Stripe subscription
-                    # Note: This requires a payment method. For migration, we'll create
-                    # subscriptions in trial mode or with a default payment method if available
-                    self.stdout.write(f'  Creating Stripe subscription for plan: {subscription.plan.name}')
-                    
-                    # For migration, we need to handle the case where there's no payment method
-                    # We'll create the subscription with trial or skip if no trial
-                    if not trial_end:
-                        self.stdout.write(self.style.WARNING(
-                            f'  ⚠ Cannot create subscription without payment method and no active trial. '
-                            f'Tenant needs to add payment method manually.'
-                        ))
-                        # Still update customer ID
-                        subscription.stripe_customer_id = customer_id
-                        subscription.save(update_fields=['stripe_customer_id', 'updated_at'])
-                        error_count += 1
-                        continue
-                    
-                    # Create subscription with trial (no payment method required during trial)
-                    import stripe
-                    stripe_subscription = stripe.Subscription.create(
-                        customer=customer_id,
-                        items=[{'price': price_id}],
-                        trial_end=int(trial_end.timestamp()) if trial_end else None,
-                        metadata={
-                            'tenant_id': str(tenant.id),
-                            'tenant_name': tenant.name,
-                            'plan_id': str(subscription.plan.id),
-                            'migrated': 'true'
-                        }
-                    )
-                    
-                    self.stdout.write(self.style.SUCCESS(
-                        f'  ✓ Stripe subscription created: {stripe_subscription.id}'
-                    ))
-                    
-                    # Step 6: Update local subscription record
-                    subscription.stripe_customer_id = customer_id
-                    subscription.stripe_subscription_id = stripe_subscription.id
-                    subscription.status = stripe_subscription.status
-                    subscription.save()
-                    
-                    self.stdout.write(self.style.SUCCESS(
-                        f'  ✓ Local subscription updated with Stripe IDs'
-                    ))
-                    
-                    success_count += 1
-                    
-            except Exception as e:
-                logger.error(f'Error migrating subscription for tenant {tenant.name}: {str(e)}', exc_info=True)
-                self.stdout.write(self.style.ERROR(
-                    f'  ✗ Error: {str(e)}'
-                ))
-                error_count += 1
+        
+        # Each worker thread kept one connection open for the whole run
+        for worker_connection in self._worker_connections:
+            worker_connection.close()
+            worker_connection.dec_thread_sharing()
         
         # Summary
         self.stdout.write('\n' + '='*60)
@@ -171,3 +127,120 @@ class Command(BaseCommand):
         if error_count > 0:
             self.stdout.write(self.style.ERROR(f'Errors: {error_count}'))
         self.stdout.write('='*60)
+
+    def _init_worker(self):
+        """
+        Register a worker thread's database connection so handle() can
+        close it once the pool has shut down.
+        """
+        worker_connection = connections[DEFAULT_DB_ALIAS]
+        worker_connection.inc_thread_sharing()
+        self._worker_connections.append(worker_connection)
+
+    def _migrate_one(self, subscription, dry_run):
+        """
+        Migrate one subscription; runs in a worker thread.
+        
+        Returns:
+            tuple: (ok, lines) where lines is this tenant's output
+        """
+        lines = []
+        tenant = subscription.tenant
+        
+        lines.append(f'\nMigrating subscription for tenant: {tenant.name} (ID: {tenant.id})')
+        
+        try:
+            # Get tenant owner for customer creation
+            owner_membership = next(iter(tenant.owner_memberships), None)
+            
+            if not owner_membership:
+                lines.append(self.style.WARNING(
+                    f'  ⚠ No owner found for tenant {tenant.name}, skipping'
+                ))
+                return False, lines
+            
+            user = owner_membership.user
+            
+            if dry_run:
+                lines.append(f'  [DRY-RUN] Would create Stripe customer for: {user.email}')
+                lines.append(f'  [DRY-RUN] Would create Stripe subscription for plan: {subscription.plan.name}')
+                return True, lines
+            
+            with transaction.atomic():
+                # Step 1: Create or get Stripe customer
+                lines.append(f'  Creating Stripe customer for: {user.email}')
+                customer = StripeService.get_or_create_customer(tenant, user)
+                customer_id = customer.id
+                lines.append(self.style.SUCCESS(f'  ✓ Stripe customer created: {customer_id}'))
+                
+                # Step 2: Determine billing cycle (default to monthly if not set)
+                billing_cycle = 'monthly'  # Default since we removed the field
+                
+                # Step 3: Get price ID
+                price_id = subscription.plan.stripe_price_id_monthly
+                if not price_id:
+                    lines.append(self.style.ERROR(
+                        f'  ✗ No Stripe price ID configured for plan {subscription.plan.name}'
+                    ))
+                    return False, lines
+                
+                # Step 4: Determine trial end
+                trial_end = None
+                if tenant.is_trial_active:
+                    trial_end = tenant.trial_ends_at
+                    lines.append(f'  Trial active until: {trial_end}')
+                
+                # Step 5: Create Stripe subscription
+                # Note: This requires a payment method. For migration, we'll create
+                # subscriptions in trial mode or with a default payment method if available
+                lines.append(f'  Creating Stripe subscription for plan: {subscription.plan.name}')
+                
+                # For migration, we need to handle the case where there's no payment method
+                # We'll create the subscription with trial or skip if no trial
+                if not trial_end:
+                    lines.append(self.style.WARNING(
+                        f'  ⚠ Cannot create subscription without payment method and no active trial. '
+                        f'Tenant needs to add payment method manually.'
+                    ))
+                    # Still update customer ID
+                    subscription.stripe_customer_id = customer_id
+                    subscription.save(update_fields=['stripe_customer_id', 'updated_at'])
+                    return False, lines
+                
+                # Create subscription with trial (no payment method required during trial)
+                stripe_subscription = stripe.Subscription.create(
+                    customer=customer_id,
+                    items=[{'price': price_id}],
+                    trial_end=int(trial_end.timestamp()) if trial_end else None,
+                    metadata={
+                        'tenant_id': str(tenant.id),
+                        'tenant_name': tenant.name,
+                        'plan_id': str(subscription.plan.id),
+                        'migrated': 'true'
+                    }
+                )
+                
+                lines.append(self.style.SUCCESS(
+                    f'  ✓ Stripe subscription created: {stripe_subscription.id}'
+                ))
+                
+                # Step 6: Update local subscription record
+                subscription.stripe_customer_id = customer_id
+                subscription.stripe_subscription_id = stripe_subscription.id
+                subscription.status = stripe_subscription.status
+                subscription.save(update_fields=[
+                    'stripe_customer_id', 'stripe_subscription_id', 'status', 'updated_at'
+                ])
+                
+                lines.append(self.style.SUCCESS(
+                    f'  ✓ Local subscription updated with Stripe IDs'
+                ))
+                
+                return True, lines
+        
+        except Exception as e:
+            logger.error(f'Error migrating subscription for tenant {tenant.name}: {str(e)}', exc_info=True)
+            lines.append(self.style.ERROR(
+                f'  ✗ Error: {str(e)}'
+            ))
+            return False, lines
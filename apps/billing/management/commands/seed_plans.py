@@ -103,16 +103,26 @@ class Command(BaseCommand):
             },
         ]
 
+        # One upsert (INSERT ... ON CONFLICT (slug) DO UPDATE) for all plans;
+        # existing slugs are read first only to report created vs updated
+        slugs = [plan_data['slug'] for plan_data in plans_data]
+        existing_slugs = set(
+            SubscriptionPlan.objects.filter(slug__in=slugs).values_list('slug', flat=True)
+        )
+        
+        update_fields = [field for field in plans_data[0] if field != 'slug'] + ['updated_at']
+        plans = SubscriptionPlan.objects.bulk_create(
+            [SubscriptionPlan(**plan_data) for plan_data in plans_data],
+            update_conflicts=True,
+            unique_fields=['slug'],
+            update_fields=update_fields,
+        )
+
         created_count = 0
         updated_count = 0
 
-        for plan_data in plans_data:
-            plan, created = SubscriptionPlan.objects.update_or_create(
-                slug=plan_data['slug'],
-                defaults=plan_data
-            )
-            
-            if created:
+        for plan in plans:
+            if plan.slug not in existing_slugs:
                 created_count += 1
                 self.stdout.write(
                     self.style.SUCCESS(f'✓ Created plan: {plan.name}')
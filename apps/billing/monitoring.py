@@ -6,7 +6,8 @@ This source code is proprietary and confidential.
 
 This module provides monitoring utilities for the Stripe billing system.
 """
-from django.db.models import Count, Q
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
 from django.utils import timezone
 from datetime import timedelta
 import logging
@@ -15,6 +16,10 @@ from .models import Subscription
 
 logger = logging.getLogger(__name__)
 
+# The dashboard aggregates rarely move within a minute
+BILLING_DASHBOARD_CACHE_KEY = 'billing:dashboard:v1'
+BILLING_DASHBOARD_CACHE_TIMEOUT = 60
+
 
 class BillingMetrics:
     """
@@ -30,11 +35,19 @@ class BillingMetrics:
             dict: Subscription metrics including counts by status
         """
         try:
-            total = Subscription.objects.count()
-            active = Subscription.objects.filter(status='active').count()
-            trialing = Subscription.objects.filter(status='trialing').count()
-            past_due = Subscription.objects.filter(status='past_due').count()
-            canceled = Subscription.objects.filter(status='canceled').count()
+            # One pass over the table with a conditional count per status
+            counts = Subscription.objects.aggregate(
+                total=Count('id'),
+                active=Count('id', filter=Q(status='active')),
+                trialing=Count('id', filter=Q(status='trialing')),
+                past_due=Count('id', filter=Q(status='past_due')),
+                canceled=Count('id', filter=Q(status='canceled')),
+            )
+            total = counts['total']
+            active = counts['active']
+            trialing = counts['trialing']
+            past_due = counts['past_due']
+            canceled = counts['canceled']
             
             return {
                 'total_subscriptions': total,
@@ -58,11 +71,12 @@ class BillingMetrics:
             dict: Payment health indicators
         """
         try:
-            total_active = Subscription.objects.filter(
-                status__in=['active', 'trialing']
-            ).count()
-            
-            past_due = Subscription.objects.filter(status='past_due').count()
+            counts = Subscription.objects.aggregate(
+                total_active=Count('id', filter=Q(status__in=['active', 'trialing'])),
+                past_due=Count('id', filter=Q(status='past_due')),
+            )
+            total_active = counts['total_active']
+            past_due = counts['past_due']
             
             # Calculate payment failure rate
             failure_rate = (past_due / total_active * 100) if total_active > 0 else 0
@@ -89,13 +103,17 @@ class BillingMetrics:
             # Get subscriptions that were created in the last 30 days
             thirty_days_ago = timezone.now() - timedelta(days=30)
             
-            recent_subscriptions = Subscription.objects.filter(
+            counts = Subscription.objects.filter(
                 created_at__gte=thirty_days_ago
+            ).aggregate(
+                total=Count('id'),
+                converted=Count('id', filter=Q(status='active')),
+                still_trialing=Count('id', filter=Q(status='trialing')),
             )
             
-            total_recent = recent_subscriptions.count()
-            converted = recent_subscriptions.filter(status='active').count()
-            still_trialing = recent_subscriptions.filter(status='trialing').count()
+            total_recent = counts['total']
+            converted = counts['converted']
+            still_trialing = counts['still_trialing']
             
             conversion_rate = (converted / total_recent * 100) if total_recent > 0 else 0
             
@@ -118,24 +136,20 @@ class BillingMetrics:
             dict: Revenue statistics
         """
         try:
-            from django.db.models import Sum, F, Case, When, DecimalField
-            
-            # Calculate MRR (Monthly Recurring Revenue)
-            subscriptions = Subscription.objects.filter(status='active')
-            
-            mrr = 0
-            arr = 0
+            # Calculate MRR (Monthly Recurring Revenue) in the database
+            # This is an approximation - actual revenue is in Stripe
+            totals = Subscription.objects.filter(status='active').aggregate(
+                mrr=Sum('plan__price_monthly'),
+                customers=Count('id'),
+            )
             
-            for sub in subscriptions:
-                # This is an approximation - actual revenue is in Stripe
-                monthly_value = float(sub.plan.price_monthly)
-                mrr += monthly_value
-                arr += monthly_value * 12
+            mrr = float(totals['mrr'] or 0)
+            arr = mrr * 12
             
             return {
                 'monthly_recurring_revenue': mrr,
                 'annual_recurring_revenue': arr,
-                'active_paying_customers': subscriptions.count(),
+                'active_paying_customers': totals['customers'],
                 'note': 'Revenue metrics are estimates. Check Stripe dashboard for actual revenue.'
             }
         except Exception as e:
@@ -143,10 +157,15 @@ class BillingMetrics:
             return {}
     
     @staticmethod
-    def check_alerts():
+    def check_alerts(health_metrics=None, trial_metrics=None):
         """
         Check for conditions that should trigger alerts.
         
+        Args:
+            health_metrics: Result of get_payment_health_metrics(), if the
+                caller already has it
+            trial_metrics: Result of get_trial_conversion_metrics(), likewise
+        
         Returns:
             list: List of alert conditions that are triggered
         """
@@ -154,7 +173,8 @@ class BillingMetrics:
         
         try:
             # Check payment failure rate
-            health_metrics = BillingMetrics.get_payment_health_metrics()
+            if health_metrics is None:
+                health_metrics = BillingMetrics.get_payment_health_metrics()
             failure_rate = health_metrics.get('payment_failure_rate', 0)
             
             if failure_rate > 10:
@@ -173,7 +193,7 @@ class BillingMetrics:
                 })
             
             # Check for subscriptions stuck in past_due
-            past_due_count = Subscription.objects.filter(status='past_due').count()
+            past_due_count = health_metrics.get('past_due_subscriptions', 0)
             if past_due_count > 0:
                 alerts.append({
                     'severity': 'warning',
@@ -183,7 +203,8 @@ class BillingMetrics:
                 })
             
             # Check for low trial conversion rate
-            trial_metrics = BillingMetrics.get_trial_conversion_metrics()
+            if trial_metrics is None:
+                trial_metrics = BillingMetrics.get_trial_conversion_metrics()
             conversion_rate = trial_metrics.get('trial_conversion_rate', 0)
             
             if conversion_rate < 20 and trial_metrics.get('total_trials_last_30_days', 0) > 10:
@@ -229,18 +250,37 @@ class BillingMetrics:
             logger.error(f"Stripe API call failed: {method} {endpoint}", extra=log_data)
 
 
-def get_billing_dashboard_data():
+def get_billing_dashboard_data(use_cache=True):
     """
     Get comprehensive billing dashboard data.
     
+    Served from the cache for up to a minute; `timestamp` is when the data
+    was computed. Pass use_cache=False to compute fresh figures.
+    
     Returns:
         dict: Complete dashboard data including metrics and alerts
     """
+    if not use_cache:
+        return _compute_billing_dashboard_data()
+    
+    data = cache.get(BILLING_DASHBOARD_CACHE_KEY)
+    if data is None:
+        data = _compute_billing_dashboard_data()
+        cache.set(BILLING_DASHBOARD_CACHE_KEY, data, BILLING_DASHBOARD_CACHE_TIMEOUT)
+    return data
+
+
+def _compute_billing_dashboard_data():
+    """Collect every dashboard metric from the database."""
+    payment_health = BillingMetrics.get_payment_health_metrics()
+    trial_conversion = BillingMetrics.get_trial_conversion_metrics()
+    
     return {
         'subscription_metrics': BillingMetrics.get_subscription_metrics(),
-        'payment_health': BillingMetrics.get_payment_health_metrics(),
-        'trial_conversion': BillingMetrics.get_trial_conversion_metrics(),
+        'payment_health': payment_health,
+        'trial_conversion': trial_conversion,
         'revenue_metrics': BillingMetrics.get_revenue_metrics(),
-        'alerts': BillingMetrics.check_alerts(),
+        # Alerts are derived from the metrics above; no queries of their own
+        'alerts': BillingMetrics.check_alerts(payment_health, trial_conversion),
         'timestamp': timezone.now().isoformat()
     }
@@ -11,6 +11,24 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+_OTP_SUBJECTS = {
+    'email_verification': 'Verify Your Email - FieldRino',
+    'password_reset': 'Password Reset Code - FieldRino'
+}
+_OTP_TEMPLATES = {
+    'email_verification': 'auth/email_verification',
+    'password_reset': 'auth/password_reset'
+}
+
+# Only the chosen subject is formatted, with the request number
+_SERVICE_REQUEST_SUBJECTS = {
+    'created': 'Service Request Received - {number}',
+    'accepted': 'Service Request Accepted - {number}'
+}
+_SERVICE_REQUEST_TEMPLATES = {
+    'created': 'service_requests/request_created',
+    'accepted': 'service_requests/request_accepted'
+}
 
 def send_template_email(
     subject,
@@ -18,7 +36,8 @@ def send_template_email(
     context,
     recipient_list,
     from_email=None,
-    fail_silently=False
+    fail_silently=False,
+    connection=None
 ):
     """
     Send email using HTML and text templates.
@@ -30,6 +49,7 @@ def send_template_email(
         recipient_list: List of recipient email addresses
         from_email: Sender email (defaults to DEFAULT_FROM_EMAIL)
         fail_silently: Whether to suppress exceptions
+        connection: Open mail connection to reuse (defaults to a new one)
     
     Returns:
         bool: True if email sent successfully, False otherwise
@@ -56,7 +76,8 @@ def send_template_email(
             subject=subject,
             body=text_content,
             from_email=from_email or settings.DEFAULT_FROM_EMAIL,
-            to=recipient_list
+            to=recipient_list,
+            connection=connection
         )
         
         # Attach HTML version
@@ -75,27 +96,18 @@ def send_template_email(
         return False
 
 
-def send_otp_email(user, purpose):
+def send_otp_email(user, purpose, connection=None):
     """
     Send OTP email to user for verification or password reset.
     
     Args:
         user: User instance
         purpose: 'email_verification' or 'password_reset'
+        connection: Open mail connection to reuse (optional)
     
     Returns:
         bool: True if email sent successfully
     """
-    subject_map = {
-        'email_verification': 'Verify Your Email - FieldRino',
-        'password_reset': 'Password Reset Code - FieldRino'
-    }
-    
-    template_map = {
-        'email_verification': 'auth/email_verification',
-        'password_reset': 'auth/password_reset'
-    }
-    
     context = {
         'first_name': user.first_name,
         'otp_code': user.otp_code,
@@ -103,11 +115,12 @@ def send_otp_email(user, purpose):
     }
     
     return send_template_email(
-        subject=subject_map.get(purpose, 'OTP Code - FieldRino'),
-        template_name=template_map.get(purpose, 'auth/email_verification'),
+        subject=_OTP_SUBJECTS.get(purpose, 'OTP Code - FieldRino'),
+        template_name=_OTP_TEMPLATES.get(purpose, 'auth/email_verification'),
         context=context,
         recipient_list=[user.email],
-        fail_silently=False
+        fail_silently=False,
+        connection=connection
     )
 
 
@@ -190,15 +203,7 @@ def send_service_request_email(request, customer, email_type='created'):
     Returns:
         bool: True if email sent successfully
     """
-    subject_map = {
-        'created': f'Service Request Received - {request.request_number}',
-        'accepted': f'Service Request Accepted - {request.request_number}'
-    }
-    
-    template_map = {
-        'created': 'service_requests/request_created',
-        'accepted': 'service_requests/request_accepted'
-    }
+    subject = _SERVICE_REQUEST_SUBJECTS.get(email_type)
     
     context = {
         'customer_name': customer.full_name if hasattr(customer, 'full_name') else customer.name,
@@ -216,8 +221,8 @@ def send_service_request_email(request, customer, email_type='created'):
         })
     
     return send_template_email(
-        subject=subject_map.get(email_type),
-        template_name=template_map.get(email_type),
+        subject=subject and subject.format(number=request.request_number),
+        template_name=_SERVICE_REQUEST_TEMPLATES.get(email_type),
         context=context,
         recipient_list=[customer.email],
         fail_silently=True
@@ -4,11 +4,26 @@ Core Models - Base classes and mixins
 Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
+import os
+import time
 import uuid
 from django.db import models
 from django.utils import timezone
 
 
+def uuid7():
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562).
+    
+    The leading 48 bits are the Unix timestamp in milliseconds, so new primary
+    keys land on the right-most B-tree leaf instead of a random page.
+    """
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+
 class SoftDeleteManager(models.Manager):
     """
     Manager that excludes soft-deleted records by default.
@@ -6,10 +6,19 @@ This source code is proprietary and confidential.
 """
 from rest_framework import permissions
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
 import logging
 
 logger = logging.getLogger(__name__)
 
+# How long a full schema scan that found no customer is trusted
+CUSTOMER_SCAN_CACHE_TIMEOUT = 60 * 60  # 1 hour
+
+# Per-tenant query budget during a schema scan, so one degraded schema
+# cannot stall the whole search
+CUSTOMER_SCAN_STATEMENT_TIMEOUT = '200ms'
+
 
 # Store role permissions globally for views
 _VIEW_ROLE_PERMISSIONS = {}
@@ -43,38 +52,118 @@ def method_role_permissions(**role_map):
     return decorator
 
 
-def get_customer_tenant(user):
+def get_customer_tenant(user, scan=True):
     """
     Find which tenant a customer user belongs to.
-    Searches across all tenant schemas to find the customer profile.
+    Looks up the CustomerTenant index first. Users not indexed yet need a
+    search of every tenant schema: done inline when `scan` is True,
+    otherwise queued to Celery (the next call then hits the index).
     
     Returns:
         tuple: (tenant, customer) or (None, None) if not found
     """
-    from apps.tenants.models import Tenant
-    from django_tenants.utils import schema_context
+    from apps.tenants.models import CustomerTenant
     
     if not user or not user.is_authenticated:
         return None, None
     
-    # Search across all active tenants
-    tenants = Tenant.objects.filter(is_active=True)
+    links = list(
+        CustomerTenant.objects.filter(user=user, tenant__is_active=True).select_related('tenant')
+    )
+    for link in links:
+        customer = _get_tenant_customer(link.tenant, user)
+        if customer:
+            return link.tenant, customer
+    if links or cache.get(get_customer_scan_cache_key(user.pk)):
+        return None, None
+    
+    if not scan:
+        queue_customer_tenant_scan(user.pk)
+        return None, None
+    
+    return scan_customer_tenants(user)
+
+
+def get_customer_scan_cache_key(user_id):
+    """Cache key marking that a user was found in no tenant schema."""
+    return f"customer_tenant:scanned:{user_id}"
+
+
+def queue_customer_tenant_scan(user_id):
+    """Queue a schema search for a user, at most once per few minutes."""
+    from apps.tenants.tasks import index_customer_tenant
+    
+    if not cache.add(f"customer_tenant:queued:{user_id}", 1, 5 * 60):
+        return
+    try:
+        index_customer_tenant.delay(str(user_id))
+    except Exception as e:
+        logger.warning("Could not queue customer tenant scan for %s: %s", user_id, e)
+
+
+def scan_customer_tenants(user):
+    """
+    Search every active tenant schema for the user's Customer, indexing
+    the tenant when found and remembering a miss for an hour.
     
+    Returns:
+        tuple: (tenant, customer) or (None, None) if not found
+    """
+    from apps.tenants.models import CustomerTenant, Tenant
+    
+    # Only the columns used here, streamed rather than loaded all at once
+    tenants = Tenant.objects.filter(is_active=True).only(
+        'id', 'name', 'slug', 'schema_name'
+    ).iterator(chunk_size=100)
+    
+    timed_out = False
     for tenant in tenants:
         try:
-            with schema_context(tenant.schema_name):
-                from apps.facilities.models import Customer
-                customer = Customer.objects.filter(user=user).first()
-                if customer:
-                    logger.info(f"Found customer profile for {user.email} in tenant {tenant.slug}")
-                    return tenant, customer
-        except Exception as e:
-            logger.debug(f"Error checking tenant {tenant.slug} for customer: {str(e)}")
+            customer = _get_tenant_customer(tenant, user, timeout=CUSTOMER_SCAN_STATEMENT_TIMEOUT)
+        except OperationalError as e:
+            logger.warning("Customer lookup in tenant %s timed out: %s", tenant.slug, e)
+            timed_out = True
             continue
+        if customer:
+            logger.info("Found customer profile for %s in tenant %s", user.email, tenant.slug)
+            CustomerTenant.objects.get_or_create(tenant=tenant, user=user)
+            return tenant, customer
     
+    # A schema that timed out may still hold the customer; let the next call rescan
+    if not timed_out:
+        cache.set(get_customer_scan_cache_key(user.pk), True, CUSTOMER_SCAN_CACHE_TIMEOUT)
     return None, None
 
 
+def _get_tenant_customer(tenant, user, timeout=None):
+    """
+    Return the user's Customer in a tenant's schema, or None.
+    
+    With `timeout` (a Postgres interval such as '200ms') the lookup runs in
+    its own transaction with a transaction-local statement_timeout, and a
+    cancelled query raises OperationalError for the caller. Inside an
+    outer transaction the setting would outlive this call, so it is only
+    applied when no transaction is open.
+    """
+    from django_tenants.utils import schema_context
+    from apps.facilities.models import Customer
+    
+    try:
+        with schema_context(tenant.schema_name):
+            if not timeout or connection.in_atomic_block:
+                return Customer.objects.filter(user=user).first()
+            
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT set_config('statement_timeout', %s, true)", [timeout])
+                return Customer.objects.filter(user=user).first()
+    except Exception as e:
+        if timeout and isinstance(e, OperationalError):
+            raise
+        logger.debug("Error checking tenant %s for customer: %s", tenant.slug, e)
+        return None
+
+
 def with_customer_tenant_context(view_func):
     """
     Decorator to ensure customer views run in the correct tenant schema context.
@@ -169,7 +258,7 @@ def ensure_tenant_role(request):
                     ).first()
                     
                     if membership:
-                        logger.info(f"Using membership from different tenant for user {request.user.email}: {membership.role}")
+                        logger.info("Using membership from different tenant for user %s: %s", request.user.email, membership.role)
                 
                 if membership:
                     request.tenant_role = membership.role
@@ -177,7 +266,7 @@ def ensure_tenant_role(request):
                     # Also set customer_tenant for customer role
                     if membership.role == 'customer':
                         request.customer_tenant = membership.tenant
-                    logger.info(f"Set tenant_role={membership.role} for user {request.user.email}")
+                    logger.info("Set tenant_role=%s for user %s", membership.role, request.user.email)
             
             # If no membership found, check if user is a customer
             if not hasattr(request, 'tenant_role') or request.tenant_role is None:
@@ -190,9 +279,9 @@ def ensure_tenant_role(request):
                             request.tenant_role = 'customer'
                             request.customer_profile = customer
                             request.customer_tenant = tenant
-                            logger.info(f"Set tenant_role=customer for user {request.user.email}")
+                            logger.info("Set tenant_role=customer for user %s", request.user.email)
                     except Exception as customer_error:
-                        logger.warning(f"Error checking customer profile: {str(customer_error)}")
+                        logger.warning("Error checking customer profile: %s", customer_error)
                 else:
                     # No tenant context - search across all tenants for customer
                     customer_tenant, customer = get_customer_tenant(request.user)
@@ -200,11 +289,11 @@ def ensure_tenant_role(request):
                         request.tenant_role = 'customer'
                         request.customer_profile = customer
                         request.customer_tenant = customer_tenant
-                        logger.info(f"Set tenant_role=customer for user {request.user.email} in tenant {customer_tenant.slug}")
+                        logger.info("Set tenant_role=customer for user %s in tenant %s", request.user.email, customer_tenant.slug)
                     else:
-                        logger.warning(f"No active membership or customer profile found for user {request.user.email}")
+                        logger.warning("No active membership or customer profile found for user %s", request.user.email)
         except Exception as e:
-            logger.error(f"Error getting tenant membership: {str(e)}", exc_info=True)
+            logger.error("Error getting tenant membership: %s", e, exc_info=True)
 
 
 class IsTenantUser(permissions.BasePermission):
@@ -400,7 +489,7 @@ class MethodRolePermission(permissions.BasePermission):
         
         has_perm = tenant_role in allowed_roles
         if not has_perm:
-            logger.warning(f"Permission denied: tenant_role '{tenant_role}' not in allowed_roles {allowed_roles} for method {request.method} (view: {type(view).__name__}, role_map: {role_map})")
+            logger.warning("Permission denied: tenant_role '%s' not in allowed_roles %s for method %s (view: %s, role_map: %s)", tenant_role, allowed_roles, request.method, type(view).__name__, role_map)
         
         return has_perm
 
@@ -0,0 +1,47 @@
+"""
+API Renderers
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that encodes with orjson instead of the stdlib json module.
+    
+    Types orjson cannot encode (or would format differently, like
+    datetimes) go through DRF's own JSONEncoder.default, and anything orjson
+    rejects outright, such as non-string keys or integers wider than 64
+    bits, falls back to JSONRenderer. Indented output (requested via the
+    Accept header) is a debugging aid and also uses JSONRenderer.
+    
+    The output is equivalent JSON but not byte-identical: float exponents
+    are written as `1e16` rather than `1e+16`, and NaN/Infinity become null
+    instead of raising. U+2028 and U+2029 are escaped, as JSONRenderer does,
+    so responses stay safe to embed in JavaScript.
+    """
+    
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+    
+    def __init__(self):
+        super().__init__()
+        self._default = self.encoder_class().default
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring."""
+        if data is None:
+            return b''
+        
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        try:
+            ret = orjson.dumps(data, default=self._default, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        # Valid JSON but not valid JavaScript; escaped like JSONRenderer does
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,17 @@
+"""
+Tenants App Configuration
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.apps import AppConfig
+
+
+class TenantsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.tenants'
+    verbose_name = 'Tenants'
+    
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.tenants.signals  # noqa
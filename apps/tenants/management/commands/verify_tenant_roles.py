@@ -6,6 +6,7 @@ Usage:
 """
 from django.core.management.base import BaseCommand
 from django.db import connection
+from django.db.models import Count, Prefetch, Q
 from apps.tenants.models import Tenant, TenantMember
 from apps.authentication.models import User
 
@@ -31,16 +32,26 @@ class Command(BaseCommand):
         member_count = TenantMember.objects.count()
         self.stdout.write(f'🔗 Total Tenant Members: {member_count}\n')
         
-        # Check for users with multiple memberships
-        users_with_multiple_tenants = []
-        for user in User.objects.all():
-            memberships = TenantMember.objects.filter(user=user, is_active=True)
-            if memberships.count() > 1:
-                users_with_multiple_tenants.append({
-                    'user': user,
-                    'count': memberships.count(),
-                    'memberships': memberships
-                })
+        # Check for users with multiple memberships (counted in the database)
+        active_memberships = TenantMember.objects.filter(is_active=True).select_related('tenant')
+        multi_tenant_users = User.objects.annotate(
+            active_membership_count=Count(
+                'tenant_memberships',
+                filter=Q(tenant_memberships__is_active=True)
+            )
+        ).filter(
+            active_membership_count__gt=1
+        ).prefetch_related(
+            Prefetch('tenant_memberships', queryset=active_memberships, to_attr='active_memberships')
+        )
+        users_with_multiple_tenants = [
+            {
+                'user': user,
+                'count': user.active_membership_count,
+                'memberships': user.active_memberships
+            }
+            for user in multi_tenant_users
+        ]
         
         if users_with_multiple_tenants:
             self.stdout.write(self.style.SUCCESS(
@@ -60,9 +71,12 @@ class Command(BaseCommand):
         
         # Check role distribution
         self.stdout.write(self.style.SUCCESS('\n📈 Role Distribution:'))
-        role_counts = {}
-        for member in TenantMember.objects.filter(is_active=True):
-            role_counts[member.role] = role_counts.get(member.role, 0) + 1
+        role_counts = dict(
+            TenantMember.objects.filter(is_active=True)
+            .values('role')
+            .annotate(count=Count('id'))
+            .values_list('role', 'count')
+        )
         
         for role, count in sorted(role_counts.items()):
             self.stdout.write(f'  {role}: {count}')
@@ -83,10 +97,9 @@ class Command(BaseCommand):
             ))
         
         # Check for orphaned users (users without any tenant membership)
-        orphaned_users = []
-        for user in User.objects.all():
-            if not TenantMember.objects.filter(user=user, is_active=True).exists():
-                orphaned_users.append(user)
+        orphaned_users = list(
+            User.objects.exclude(tenant_memberships__is_active=True).only('email')
+        )
         
         if orphaned_users:
             self.stdout.write(self.style.WARNING(
@@ -81,9 +81,9 @@ class TenantMembershipMiddleware:
                                         f"User {request.user.email} has no active tenant memberships"
                                     )
                     except Exception as e:
-                        logger.error(f"Error querying tenant membership: {str(e)}", exc_info=True)
+                        logger.error("Error querying tenant membership: %s", e, exc_info=True)
             except Exception as e:
-                logger.error(f"Error in TenantMembershipMiddleware: {str(e)}", exc_info=True)
+                logger.error("Error in TenantMembershipMiddleware: %s", e, exc_info=True)
         
         response = self.get_response(request)
         return response
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tenants", "0012_alter_technicianwagerate_technician"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmployeeIdCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("role_prefix", models.CharField(max_length=10)),
+                ("last_value", models.PositiveIntegerField(default=0)),
+                (
+                    "tenant",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="employee_id_counters",
+                        to="tenants.tenant",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Employee ID Counter",
+                "verbose_name_plural": "Employee ID Counters",
+                "db_table": "employee_id_counters",
+                "unique_together": {("tenant", "role_prefix")},
+            },
+        ),
+    ]
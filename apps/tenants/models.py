@@ -4,13 +4,32 @@ Tenant Models with django-tenants for schema-per-tenant multi-tenancy
 Copyright (c) 2025 FieldRino. All rights reserved.
 This source code is proprietary and confidential.
 """
+import logging
 import uuid
-from django.db import models
+from functools import cached_property
+from django.db import models, transaction
+from django.db.models import Max
+from django.db.models.functions import Cast, Substr
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.text import slugify
 from django_tenants.models import TenantMixin, DomainMixin
 
+logger = logging.getLogger(__name__)
+
+_ADMIN_ROLES = frozenset(('owner', 'admin'))
+_MANAGER_ROLES = frozenset(('owner', 'admin', 'manager'))
+
+# Employee ID prefix per TenantMember role
+_ROLE_PREFIXES = {
+    'owner': 'OWN',
+    'admin': 'ADM',
+    'manager': 'MGR',
+    'employee': 'EMP',
+    'technician': 'TEC',
+    'customer': 'CUS',
+}
+
 
 class Tenant(TenantMixin):
     """
@@ -189,27 +208,27 @@ class TenantMember(models.Model):
     def __str__(self):
         return f"{self.user.email} - {self.tenant.name} ({self.role})"
     
-    @property
+    @cached_property
     def is_owner(self):
         """Check if member is owner."""
         return self.role == 'owner'
     
-    @property
+    @cached_property
     def is_admin(self):
         """Check if member is admin or owner."""
-        return self.role in ['owner', 'admin']
+        return self.role in _ADMIN_ROLES
     
-    @property
+    @cached_property
     def is_manager(self):
         """Check if member is manager, admin, or owner."""
-        return self.role in ['owner', 'admin', 'manager']
+        return self.role in _MANAGER_ROLES
     
-    @property
+    @cached_property
     def is_technician(self):
         """Check if member is technician."""
         return self.role == 'technician'
     
-    @property
+    @cached_property
     def is_customer(self):
         """Check if member is customer."""
         return self.role == 'customer'
@@ -217,42 +236,96 @@ class TenantMember(models.Model):
     def generate_employee_id(self):
         """Generate unique employee ID within this tenant."""
         if not self.employee_id:
-            role_prefix = {
-                'owner': 'OWN',
-                'admin': 'ADM',
-                'manager': 'MGR',
-                'employee': 'EMP',
-                'technician': 'TEC',
-                'customer': 'CUS',
-            }.get(self.role, 'USR')
-            
-            # Find the highest existing employee ID for this role prefix in this tenant
-            existing_ids = TenantMember.objects.filter(
-                tenant=self.tenant,
-                employee_id__startswith=role_prefix
-            ).values_list('employee_id', flat=True)
+            role_prefix = _ROLE_PREFIXES.get(self.role, 'USR')
             
-            if existing_ids:
-                numbers = []
-                for emp_id in existing_ids:
-                    try:
-                        num = int(emp_id.replace(role_prefix, ''))
-                        numbers.append(num)
-                    except (ValueError, AttributeError):
-                        continue
-                
-                next_num = max(numbers) + 1 if numbers else 1
-            else:
-                next_num = 1
+            # Reserve the next number from the per-tenant counter row. The row
+            # lock serializes concurrent joins so two members never get the same ID.
+            with transaction.atomic():
+                counter, _ = EmployeeIdCounter.objects.select_for_update().get_or_create(
+                    tenant=self.tenant,
+                    role_prefix=role_prefix,
+                    defaults={'last_value': lambda: self._max_employee_number(role_prefix)}
+                )
+                counter.last_value += 1
+                counter.save(update_fields=['last_value'])
             
-            self.employee_id = f"{role_prefix}{next_num:04d}"
+            self.employee_id = f"{role_prefix}{counter.last_value:04d}"
+    
+    def _max_employee_number(self, role_prefix):
+        """Highest numeric suffix already issued for this prefix in this tenant."""
+        max_num = TenantMember.objects.filter(
+            tenant=self.tenant,
+            employee_id__regex=rf'^{role_prefix}[0-9]+$'
+        ).annotate(
+            employee_num=Cast(Substr('employee_id', len(role_prefix) + 1), models.BigIntegerField())
+        ).aggregate(max_num=Max('employee_num'))['max_num']
+        
+        return max_num or 0
     
     def save(self, *args, **kwargs):
+        # New members get their employee ID asynchronously once the row is committed
+        if self._state.adding and not self.employee_id:
+            super().save(*args, **kwargs)
+            member_id = str(self.pk)
+            transaction.on_commit(lambda: self._queue_employee_id(member_id))
+            return
+        
         # Generate employee ID if not set
         if not self.employee_id:
             self.generate_employee_id()
         
         super().save(*args, **kwargs)
+    
+    @staticmethod
+    def _queue_employee_id(member_id):
+        """Queue employee ID generation, falling back to inline if the broker is down."""
+        from .tasks import assign_employee_id
+        
+        try:
+            assign_employee_id.delay(member_id)
+        except Exception as e:
+            logger.warning("Could not queue employee ID for member %s: %s", member_id, e)
+            assign_employee_id(member_id)
+
+
+class EmployeeIdCounter(models.Model):
+    """
+    Last employee number issued per tenant and role prefix.
+    Seeded from existing TenantMember IDs the first time a prefix is used.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='employee_id_counters')
+    role_prefix = models.CharField(max_length=10)
+    last_value = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        db_table = 'employee_id_counters'
+        unique_together = ['tenant', 'role_prefix']
+        verbose_name = 'Employee ID Counter'
+        verbose_name_plural = 'Employee ID Counters'
+    
+    def __str__(self):
+        return f"{self.tenant_id} {self.role_prefix}: {self.last_value}"
+
+
+class CustomerTenant(models.Model):
+    """
+    Public-schema index of the tenants in which a user is linked to a
+    Customer. Customer rows live in each tenant's schema, so without it
+    finding a customer's tenant means searching every schema.
+    Kept in sync by the Customer signals in apps.tenants.signals.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='customer_links')
+    user = models.ForeignKey('authentication.User', on_delete=models.CASCADE, related_name='customer_tenants')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'customer_tenants'
+        unique_together = ['tenant', 'user']
+        verbose_name = 'Customer Tenant'
+        verbose_name_plural = 'Customer Tenants'
+    
+    def __str__(self):
+        return f"{self.user_id} is a customer of {self.tenant_id}"
 
 
 class TenantSettings(models.Model):
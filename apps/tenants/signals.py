@@ -0,0 +1,74 @@
+"""
+Tenant Signals
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from django.db import connection
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django_tenants.utils import get_public_schema_name
+import logging
+
+from .models import CustomerTenant, Tenant
+
+logger = logging.getLogger(__name__)
+
+
+def get_current_tenant_id():
+    """Return the id of the tenant whose schema is active, or None."""
+    if connection.schema_name == get_public_schema_name():
+        return None
+    
+    # schema_context() only sets a FakeTenant, which has no id
+    tenant_id = getattr(connection.tenant, 'id', None)
+    if tenant_id is None:
+        tenant_id = Tenant.objects.filter(
+            schema_name=connection.schema_name
+        ).values_list('id', flat=True).first()
+    return tenant_id
+
+
+def prune_customer_links(tenant_id):
+    """
+    Drop this tenant's links for users no longer linked to a live Customer.
+    The subquery runs against the current tenant's customers table.
+    """
+    from apps.facilities.models import Customer
+    
+    CustomerTenant.objects.filter(tenant_id=tenant_id).exclude(
+        user_id__in=Customer.objects.filter(user__isnull=False).values('user_id')
+    ).delete()
+
+
+@receiver(post_save, sender='facilities.Customer')
+def sync_customer_tenant(sender, instance, **kwargs):
+    """
+    Index the customer's user under the current tenant, and drop links
+    left behind when a customer is unlinked or soft-deleted.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and not {'user', 'deleted_at'} & set(update_fields):
+        return
+    
+    tenant_id = get_current_tenant_id()
+    if tenant_id is None:
+        return
+    
+    if instance.user_id and instance.deleted_at is None:
+        CustomerTenant.objects.get_or_create(tenant_id=tenant_id, user_id=instance.user_id)
+    if not kwargs.get('created'):
+        prune_customer_links(tenant_id)
+
+
+@receiver(post_delete, sender='facilities.Customer')
+def remove_customer_tenant(sender, instance, **kwargs):
+    """
+    Drop the link when a customer is hard-deleted.
+    """
+    if not instance.user_id:
+        return
+    
+    tenant_id = get_current_tenant_id()
+    if tenant_id is not None:
+        CustomerTenant.objects.filter(tenant_id=tenant_id, user_id=instance.user_id).delete()
@@ -0,0 +1,58 @@
+"""
+Tenant Celery Tasks
+
+Copyright (c) 2025 FieldRino. All rights reserved.
+This source code is proprietary and confidential.
+"""
+from celery import shared_task
+import logging
+
+from apps.authentication.cache import UserCache
+from .models import TenantMember
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def assign_employee_id(member_id):
+    """
+    Generate the employee ID for a newly created tenant member.
+    Queued after commit by TenantMember.save so signup and invitation
+    acceptance do not wait on the counter lock.
+    """
+    try:
+        member = TenantMember.objects.select_related('tenant').get(pk=member_id)
+    except TenantMember.DoesNotExist:
+        logger.warning("Tenant member %s no longer exists, skipping employee ID", member_id)
+        return None
+    
+    if member.employee_id:
+        return member.employee_id
+    
+    member.generate_employee_id()
+    TenantMember.objects.filter(pk=member.pk, employee_id='').update(
+        employee_id=member.employee_id
+    )
+    # The queryset update sends no post_save, so drop the /me/ payload here
+    UserCache.invalidate_user_data(member.user_id)
+    
+    logger.info("Assigned employee ID %s to tenant member %s", member.employee_id, member_id)
+    return member.employee_id
+
+
+@shared_task
+def index_customer_tenant(user_id):
+    """
+    Search every tenant schema for a user's Customer and index the tenant.
+    Queued by login for users the CustomerTenant index has not seen yet,
+    so the schema scan never runs on the request.
+    """
+    from apps.authentication.models import User
+    from apps.core.permissions import scan_customer_tenants
+    
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return None
+    
+    tenant, customer = scan_customer_tenants(user)
+    return str(tenant.pk) if tenant else None
@@ -64,6 +64,8 @@ cat > /opt/fieldrino/.env << 'EOF'
 DEBUG=False
 SECRET_KEY=${django_secret_key}
 ALLOWED_HOSTS=.${domain_name},${domain_name}
+# nginx appends the client address to X-Forwarded-For
+NUM_PROXIES=1
 
 # Database
 DATABASE_URL=postgresql://${db_username}:${db_password}@${db_host}:5432/${db_name}
@@ -115,7 +117,9 @@ cat > /opt/fieldrino/gunicorn.conf.py << 'EOF'
 import multiprocessing
 
 workers = 4
-worker_class = "sync"
+# Threads overlap requests waiting on Postgres, Redis or SMTP
+worker_class = "gthread"
+threads = 4
 timeout = 120
 keepalive = 5
 max_requests = 1000
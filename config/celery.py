@@ -36,6 +36,12 @@ app.conf.beat_schedule = {
         'task': 'apps.billing.tasks.sync_subscriptions_from_stripe',
         'schedule': crontab(hour='*/6', minute=0),  # Every 6 hours
     },
+    
+    # Delete old login attempts and clear expired OTPs / reset tokens
+    'purge-auth-artifacts': {
+        'task': 'apps.authentication.tasks.purge_auth_artifacts',
+        'schedule': crontab(hour=3, minute=0),  # 3 AM daily
+    },
 }
 
 # Celery configuration
@@ -126,6 +126,15 @@ DATABASE_ROUTERS = (
     'django_tenants.routers.TenantSyncRouter',
 )
 
+# Password hashing: Argon2id first; the rest only verify (and upgrade) legacy hashes
+PASSWORD_HASHERS = [
+    'apps.authentication.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -161,7 +170,8 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # File Upload Settings
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000  # Increased from default 1000 for file uploads
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB in bytes
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB in bytes
+# Larger uploads are spooled to a temporary file instead of held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB in bytes
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -178,12 +188,15 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'apps.core.pagination.CustomPageNumberPagination',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'apps.core.exceptions.custom_exception_handler',
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Reverse proxies that append to X-Forwarded-For (nginx in production);
+    # rate limits key on the hop the nearest one added, never a client-written one
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
 }
 
 # DRF Spectacular (Swagger/OpenAPI) Configuration
@@ -362,6 +375,9 @@ SIMPLE_JWT = {
     'TOKEN_TYPE_CLAIM': 'token_type',
 }
 
+# Cache validated access tokens in-process (see TenantJWTAuthentication)
+CACHE_VALIDATED_JWT = config('CACHE_VALIDATED_JWT', default=True, cast=bool)
+
 # CORS Configuration
 # In production, use environment variable to set allowed origins
 # Example: CORS_ALLOWED_ORIGINS=https://app.fieldrino.com,https://admin.fieldrino.com
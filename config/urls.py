@@ -8,13 +8,20 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView, SpectacularRedocView
 
+schema_view = vary_on_headers('Accept')(SpectacularAPIView.as_view())
+if not settings.DEBUG:
+    # Generating the schema walks every view; it only changes on deploy
+    schema_view = cache_page(60 * 60)(schema_view)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', schema_view, name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
     